@@ -0,0 +1,60 @@
+import click
+import frappe
+from frappe.commands import get_site, pass_context
+
+
+@click.command("rebuild-payment-candidates")
+@click.option("--company", help="Rebuild candidates only for this company")
+@pass_context
+def rebuild_payment_candidates(context, company=None):
+    "Rebuild the Payments Processor Candidate index from submitted Purchase Invoices"
+    from payments_processor.payments_processor.doctype.payments_processor_candidate.payments_processor_candidate import (
+        rebuild_candidates,
+    )
+
+    site = get_site(context)
+
+    with frappe.init_site(site):
+        frappe.connect()
+        rebuild_candidates(company)
+        frappe.db.commit()
+
+    click.secho("Payment candidates rebuilt successfully", fg="green")
+
+
+@click.command("check-payment-queries")
+@click.option("--company", help="Check queries only for configurations of this company")
+@pass_context
+def check_payment_queries(context, company=None):
+    "Explain the Payments Processor queries and warn about full table scans"
+    from payments_processor.payments_processor.utils.query_plan import (
+        check_query_plans,
+    )
+
+    site = get_site(context)
+
+    with frappe.init_site(site):
+        frappe.connect()
+        plans = check_query_plans(company)
+
+    full_scans = False
+
+    for configuration, queries in plans.items():
+        for query, tables in queries.items():
+            full_scans = True
+            click.secho(
+                f"{configuration}: {query} query does a full scan of"
+                f" {', '.join(tables)}",
+                fg="yellow",
+            )
+
+    if full_scans:
+        click.secho(
+            "Run `bench migrate` to create missing indexes, and check again",
+            fg="yellow",
+        )
+    else:
+        click.secho("No full scans found in payment queries", fg="green")
+
+
+commands = [rebuild_payment_candidates, check_payment_queries]
@@ -1,3 +1,5 @@
 BUG_REPORT_URL = "https://github.com/resilient-tech/payments-processor/issues/new"
 
 CONFIGURATION_DOCTYPE = "Payments Processor Configuration"
+CANDIDATE_DOCTYPE = "Payments Processor Candidate"
+RUN_DOCTYPE = "Payments Processor Run"
@@ -14,3 +14,48 @@ scheduler_events = {
         "payments_processor.payments_processor.utils.automation.autocreate_payment_entry"
     ]
 }
+
+doc_events = {
+    "Purchase Invoice": {
+        "on_change": [
+            "payments_processor.payments_processor.doctype.payments_processor_candidate.payments_processor_candidate.update_invoice_candidates",
+            "payments_processor.payments_processor.utils.report_cache.invalidate_cache",
+        ],
+    },
+    "Payment Entry": {
+        "on_submit": [
+            "payments_processor.payments_processor.doctype.payments_processor_candidate.payments_processor_candidate.update_reference_candidates",
+            "payments_processor.payments_processor.utils.report_cache.invalidate_cache",
+        ],
+        "on_cancel": [
+            "payments_processor.payments_processor.doctype.payments_processor_candidate.payments_processor_candidate.update_reference_candidates",
+            "payments_processor.payments_processor.utils.report_cache.invalidate_cache",
+        ],
+    },
+    "Journal Entry": {
+        "on_submit": [
+            "payments_processor.payments_processor.doctype.payments_processor_candidate.payments_processor_candidate.update_reference_candidates",
+            "payments_processor.payments_processor.utils.report_cache.invalidate_cache",
+        ],
+        "on_cancel": [
+            "payments_processor.payments_processor.doctype.payments_processor_candidate.payments_processor_candidate.update_reference_candidates",
+            "payments_processor.payments_processor.utils.report_cache.invalidate_cache",
+        ],
+    },
+    "Supplier": {
+        "on_update": "payments_processor.payments_processor.utils.report_cache.invalidate_cache",
+        "on_trash": "payments_processor.payments_processor.utils.report_cache.invalidate_cache",
+    },
+    "Bank Account": {
+        "on_update": "payments_processor.payments_processor.utils.supplier_cache.invalidate_bank_account",
+        "on_trash": "payments_processor.payments_processor.utils.supplier_cache.invalidate_bank_account",
+    },
+    "Contact": {
+        "on_update": "payments_processor.payments_processor.utils.supplier_cache.invalidate_contact",
+        "on_trash": "payments_processor.payments_processor.utils.supplier_cache.invalidate_contact",
+    },
+}
+
+default_log_clearing_doctypes = {
+    "Payments Processor Run": 180,
+}
@@ -0,0 +1,5 @@
+from payments_processor.setup import create_indexes
+
+
+def execute():
+    create_indexes()
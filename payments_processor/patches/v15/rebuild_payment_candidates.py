@@ -0,0 +1,5 @@
+from payments_processor.setup import create_payment_candidates
+
+
+def execute():
+    create_payment_candidates()
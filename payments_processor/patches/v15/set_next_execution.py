@@ -0,0 +1,15 @@
+import frappe
+
+from payments_processor.constants import CONFIGURATION_DOCTYPE
+from payments_processor.payments_processor.utils.automation import get_next_execution
+
+
+def execute():
+    for setting in frappe.get_all(CONFIGURATION_DOCTYPE, "*"):
+        frappe.db.set_value(
+            CONFIGURATION_DOCTYPE,
+            setting.name,
+            "next_execution",
+            get_next_execution(setting),
+            update_modified=False,
+        )
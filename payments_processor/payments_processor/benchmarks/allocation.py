@@ -0,0 +1,65 @@
+"""
+Benchmark for cash budget allocation.
+
+Usage:
+    bench --site <site> execute payments_processor.payments_processor.benchmarks.allocation.run
+"""
+
+import time
+
+import frappe
+
+from payments_processor.payments_processor.benchmarks.columnar import (
+    get_processor,
+    get_sample_rows,
+)
+from payments_processor.payments_processor.utils.allocation import (
+    allocate_cash_budget,
+)
+
+SIZES = (10_000, 100_000, 1_000_000)
+
+# share of the total amount to pay available as cash budget
+BUDGET_SHARES = (0.25, 0.5, 0.9)
+
+
+def run(sizes=SIZES, company=None):
+    processor = get_processor(company)
+
+    for size in sizes:
+        invoices = get_sample_invoices(processor, int(size))
+        total = sum(invoice.amount_to_pay for invoice in invoices)
+
+        for share in BUDGET_SHARES:
+            start = time.perf_counter()
+            skipped = allocate_cash_budget(
+                invoices, total * share, processor.offset_due_date
+            )
+            duration = time.perf_counter() - start
+
+            paid = {invoice.name for invoice in invoices} - {
+                invoice.name for invoice in skipped
+            }
+            discount = sum(
+                invoice.total_discount for invoice in invoices if invoice.name in paid
+            )
+
+            print(
+                f"{len(invoices):>10,} invoices | budget: {share:4.0%} | {duration:8.3f}s"
+                f" | paid: {len(paid):>9,} | discount captured: {discount:14,.2f}"
+            )
+
+
+def get_sample_invoices(processor, size):
+    """
+    Due invoices from sample rows, with the amount to pay set as in
+    `validate_auto_generate`.
+    """
+    processor.invoices = frappe._dict()
+    processor.process_invoice_rows(get_sample_rows(size, processor.today))
+
+    invoices = list(processor.invoices.values())
+    for invoice in invoices:
+        invoice.amount_to_pay = invoice.total_outstanding_due - invoice.total_discount
+
+    return invoices
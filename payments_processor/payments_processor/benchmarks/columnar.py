@@ -0,0 +1,136 @@
+"""
+Benchmark for row-wise and columnar evaluation of due invoice rows.
+
+Usage:
+    bench --site <site> execute payments_processor.payments_processor.benchmarks.columnar.run
+"""
+
+import random
+import time
+
+import frappe
+from frappe.utils import add_days, getdate
+
+from payments_processor.payments_processor.utils.automation import PaymentsProcessor
+from payments_processor.payments_processor.utils.columnar import ColumnarEvaluator
+
+SIZES = (10_000, 100_000, 1_000_000)
+
+
+def run(sizes=SIZES, company=None):
+    processor = get_processor(company)
+
+    for size in sizes:
+        rows = get_sample_rows(int(size), processor.today)
+
+        rowwise, rowwise_invoices = time_evaluation(
+            processor,
+            rows,
+            lambda rows: [processor.process_invoice_row(row) for row in rows],
+        )
+        columnar, columnar_invoices = time_evaluation(
+            processor, rows, ColumnarEvaluator(processor).process
+        )
+
+        if rowwise_invoices != columnar_invoices:
+            frappe.throw(f"Columnar evaluation does not match for {size} terms")
+
+        print(
+            f"{size:>10,} terms | row-wise: {rowwise:8.3f}s | columnar: {columnar:8.3f}s"
+            f" | speedup: {rowwise / columnar:5.2f}x"
+        )
+
+
+def time_evaluation(processor, rows, evaluate):
+    # rows are updated during evaluation
+    rows = [frappe._dict(row) for row in rows]
+    processor.invoices = frappe._dict()
+
+    start = time.perf_counter()
+    evaluate(rows)
+
+    return time.perf_counter() - start, processor.invoices
+
+
+def get_processor(company=None, **setting):
+    company = company or frappe.get_all("Company", pluck="name", limit=1)[0]
+
+    return PaymentsProcessor(
+        frappe._dict(
+            {
+                "company": company,
+                "automate_on_monday": 1,
+                "automate_on_thursday": 1,
+                "claim_early_payment_discount": 1,
+                "due_date_offset": 2,
+                **setting,
+            }
+        )
+    )
+
+
+def get_sample_rows(size, today=None, seed=0):
+    """
+    Deterministic Purchase Invoice x Payment Schedule rows, as returned by the
+    invoice query and sorted by term due date.
+
+    Includes returns, part paid invoices, and multi-term invoices with
+    percentage and amount discounts.
+    """
+    today = getdate(today)
+    rng = random.Random(seed)
+    rows = []
+
+    while len(rows) < size:
+        invoice = f"PI-{len(rows):08d}"
+        term_count = rng.choice((1, 1, 1, 2, 3, 4, 12))
+        grand_total = round(rng.uniform(100, 100_000), 2)
+        rounded_total = rng.choice((0, round(grand_total)))
+        paid_amount = rng.choice((0, 0, round(grand_total * rng.random(), 2)))
+        is_return = int(rng.random() < 0.05)
+        first_due_date = add_days(today, rng.randint(-60, 30))
+
+        term_amount = round((rounded_total or grand_total) / term_count, 2)
+
+        for idx in range(term_count):
+            due_date = add_days(first_due_date, idx * 30)
+            discount_type = rng.choice((None, "Percentage", "Amount"))
+
+            rows.append(
+                frappe._dict(
+                    {
+                        "name": invoice,
+                        "company": "_Test Company",
+                        "supplier": f"Supplier {rng.randint(1, size // 10 + 1)}",
+                        "outstanding_amount": (rounded_total or grand_total)
+                        - paid_amount,
+                        "grand_total": grand_total,
+                        "rounded_total": rounded_total,
+                        "currency": "INR",
+                        "contact_person": None,
+                        "bill_no": None,
+                        "is_return": is_return,
+                        "on_hold": 0,
+                        "hold_comment": None,
+                        "release_date": None,
+                        "term_name": f"{invoice}-{idx}",
+                        "term_due_date": due_date,
+                        "term_outstanding_amount": term_amount,
+                        "term_discount_date": discount_type
+                        and add_days(due_date, -rng.randint(0, 20)),
+                        "term_discount_type": discount_type,
+                        "term_discount": (
+                            rng.choice((1, 2, 2.5))
+                            if discount_type == "Percentage"
+                            else round(rng.uniform(0, 50), 2)
+                            if discount_type
+                            else 0
+                        ),
+                    }
+                )
+            )
+
+    rows = rows[:size]
+    rows.sort(key=lambda row: (row.term_due_date, row.term_name))
+
+    return rows
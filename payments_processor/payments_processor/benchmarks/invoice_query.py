@@ -0,0 +1,134 @@
+"""
+Benchmark for fetching due invoice rows with a single Purchase Invoice x Payment
+Schedule join, and with separate payment term and invoice queries.
+
+Usage:
+    bench --site <site> execute payments_processor.payments_processor.benchmarks.invoice_query.run
+"""
+
+import time
+
+import frappe
+from pypika import Order
+
+from payments_processor.payments_processor.benchmarks.columnar import get_processor
+from payments_processor.payments_processor.benchmarks.ledger import (
+    delete_ledger,
+    make_ledger,
+)
+
+SIZES = (10_000, 50_000)
+
+# payment terms of each invoice (eg: 12 monthly installments)
+TERM_COUNTS = (1, 4, 12)
+
+
+def run(sizes=SIZES, term_counts=TERM_COUNTS, company=None):
+    company = company or frappe.get_all("Company", pluck="name", limit=1)[0]
+
+    for size in sizes:
+        for term_count in term_counts:
+            try:
+                make_ledger(int(size), company, term_counts=(int(term_count),))
+                compare_queries(size, term_count, get_processor(company))
+
+            finally:
+                frappe.db.rollback()
+                delete_ledger()
+                frappe.db.commit()
+
+
+def compare_queries(size, term_count, processor):
+    joined, joined_rows = time_fetch(
+        lambda: get_joined_query(processor).run(as_dict=True)
+    )
+    split, split_rows = time_fetch(
+        lambda: [row for rows in processor.get_invoice_rows() for row in rows]
+    )
+
+    # supplier checks are joined to the split invoice query
+    fields = joined_rows[0].keys() if joined_rows else ()
+    split_rows = [
+        frappe._dict({field: row[field] for field in fields}) for row in split_rows
+    ]
+
+    if sort_rows(joined_rows) != sort_rows(split_rows):
+        frappe.throw(
+            f"Invoice rows do not match for {size} invoices x {term_count} terms"
+        )
+
+    invoice_count = len({row.name for row in split_rows})
+
+    print(
+        f"{size:>8,} invoices x {term_count:>2} terms | {len(split_rows):>8,} rows"
+        f" | join: {joined:7.3f}s, {get_cell_count(joined_rows):>10,} cells"
+        f" | split: {split:7.3f}s,"
+        f" {get_cell_count(split_rows, invoice_count):>10,} cells"
+        f" | speedup: {joined / split:5.2f}x"
+    )
+
+
+def time_fetch(fetch):
+    start = time.perf_counter()
+    rows = fetch()
+
+    return time.perf_counter() - start, rows
+
+
+def get_cell_count(rows, invoice_count=None):
+    """
+    Values transferred from the database. With separate queries, invoice fields
+    are transferred once for each invoice.
+    """
+    if not rows:
+        return 0
+
+    if invoice_count is None:
+        return len(rows) * len(rows[0])
+
+    term_fields = sum(key == "name" or key.startswith("term_") for key in rows[0])
+    invoice_fields = len(rows[0]) - term_fields + 1
+
+    return len(rows) * term_fields + invoice_count * invoice_fields
+
+
+def sort_rows(rows):
+    return sorted(rows, key=lambda row: (row.term_due_date, row.term_name))
+
+
+def get_joined_query(processor):
+    """
+    Single query joining invoice and payment term fields.
+    """
+    doc = frappe.qb.DocType("Purchase Invoice")
+    terms = frappe.qb.DocType("Payment Schedule")
+
+    return (
+        frappe.qb.from_(doc)
+        .join(terms)
+        .on((doc.name == terms.parent) & (terms.parenttype == "Purchase Invoice"))
+        .select(
+            doc.name,
+            doc.company,
+            doc.supplier,
+            doc.outstanding_amount,
+            doc.grand_total,
+            doc.rounded_total,
+            doc.currency,
+            doc.contact_person,
+            doc.bill_no,
+            doc.is_return,
+            doc.on_hold,
+            doc.hold_comment,
+            doc.release_date,
+            terms.name.as_("term_name"),
+            terms.due_date.as_("term_due_date"),
+            terms.outstanding.as_("term_outstanding_amount"),
+            terms.discount_date.as_("term_discount_date"),
+            terms.discount_type.as_("term_discount_type"),
+            terms.discount.as_("term_discount"),
+        )
+        .where(processor.get_invoice_condition(doc, terms))
+        .orderby(terms.due_date, order=Order.asc)
+        .orderby(terms.name, order=Order.asc)
+    )
@@ -0,0 +1,336 @@
+"""
+Deterministic synthetic ledger for benchmarks.
+
+Documents are bulk inserted without validations and are named with `PREFIX`, so
+that they can be removed with `delete_ledger` after the benchmark.
+"""
+
+import random
+
+import frappe
+from frappe.utils import add_days, flt, getdate, now_datetime
+
+from payments_processor.constants import CANDIDATE_DOCTYPE
+
+PREFIX = "PPBENCH"
+
+# one supplier for these many invoices
+INVOICES_PER_SUPPLIER = 10
+
+# number of payment terms of an invoice is chosen from these
+TERM_COUNTS = (1, 1, 1, 2, 3, 4)
+
+
+def make_ledger(size: int, company: str, seed: int = 0, term_counts=TERM_COUNTS):
+    """
+    Insert suppliers and `size` Purchase Invoices with their Payment Schedules,
+    GL Entries and Payment Ledger Entries.
+
+    Includes multi-term invoices, part paid invoices, returns, invoices and
+    suppliers on hold, disabled suppliers, draft invoices, draft payment entries
+    and early payment discounts.
+
+    :param term_counts: Number of payment terms of an invoice is chosen from these
+
+    Returns the number of rows inserted for each doctype.
+    """
+    generator = LedgerGenerator(size, company, seed, term_counts)
+    generator.generate()
+    generator.insert()
+
+    return {doctype: len(rows) for doctype, rows in generator.rows.items()}
+
+
+def delete_ledger():
+    """
+    Delete documents inserted by `make_ledger`, and payment entries created
+    against them.
+    """
+    like = ("like", f"{PREFIX}%")
+
+    payment_entries = list(
+        set(
+            frappe.get_all(
+                "Payment Entry Reference",
+                filters={"reference_name": like},
+                pluck="parent",
+            )
+        )
+    )
+
+    if payment_entries:
+        names = ("in", payment_entries)
+        frappe.db.delete("Payment Entry", {"name": names})
+        frappe.db.delete("Payment Entry Reference", {"parent": names})
+        frappe.db.delete("Payment Entry Deduction", {"parent": names})
+        frappe.db.delete("GL Entry", {"voucher_no": names})
+        frappe.db.delete("Payment Ledger Entry", {"voucher_no": names})
+
+    frappe.db.delete("Payment Schedule", {"parent": like})
+    frappe.db.delete("Purchase Invoice", {"name": like})
+    frappe.db.delete("GL Entry", {"voucher_no": like})
+    frappe.db.delete("Payment Ledger Entry", {"voucher_no": like})
+    frappe.db.delete("Supplier", {"name": like})
+    frappe.db.delete(CANDIDATE_DOCTYPE, {"purchase_invoice": like})
+
+
+class LedgerGenerator:
+    def __init__(self, size, company, seed=0, term_counts=TERM_COUNTS):
+        self.size = size
+        self.company = company
+        self.term_counts = term_counts
+        self.rng = random.Random(seed)
+        self.today = getdate()
+
+        company_doc = frappe.get_cached_doc("Company", company)
+        self.currency = company_doc.default_currency
+        self.payable_account = company_doc.default_payable_account
+        self.cost_center = company_doc.cost_center
+
+        self.rows = {
+            "Supplier": [],
+            "Purchase Invoice": [],
+            "Payment Schedule": [],
+            "GL Entry": [],
+            "Payment Ledger Entry": [],
+            "Payment Entry": [],
+            "Payment Entry Reference": [],
+        }
+
+    def generate(self):
+        supplier_count = max(self.size // INVOICES_PER_SUPPLIER, 1)
+
+        for idx in range(supplier_count):
+            self.make_supplier(f"{PREFIX}-SUP-{idx:06d}")
+
+        for idx in range(self.size):
+            supplier = self.rng.choice(self.rows["Supplier"])
+            self.make_invoice(f"{PREFIX}-PI-{idx:07d}", supplier["name"])
+
+    def insert(self):
+        timestamp = now_datetime()
+        common = {
+            "owner": "Administrator",
+            "modified_by": "Administrator",
+            "creation": timestamp,
+            "modified": timestamp,
+        }
+
+        for doctype, rows in self.rows.items():
+            if not rows:
+                continue
+
+            fields = [*common, *rows[0]]
+            values = [(*common.values(), *row.values()) for row in rows]
+            frappe.db.bulk_insert(doctype, fields, values)
+
+    def make_supplier(self, name):
+        rng = self.rng
+        on_hold = int(rng.random() < 0.03)
+
+        self.rows["Supplier"].append(
+            {
+                "name": name,
+                "supplier_name": name,
+                "disabled": int(rng.random() < 0.02),
+                "on_hold": on_hold,
+                "hold_type": rng.choice(("All", "Payments")) if on_hold else "",
+                "release_date": self.get_release_date() if on_hold else None,
+                "disable_auto_generate_payment_entry": int(rng.random() < 0.02),
+                "docstatus": 0,
+            }
+        )
+
+    def get_release_date(self):
+        rng = self.rng
+        return rng.choice((None, add_days(self.today, rng.randint(-5, 30))))
+
+    def make_invoice(self, name, supplier):
+        rng = self.rng
+
+        is_return = int(rng.random() < 0.05)
+        docstatus = 0 if rng.random() < 0.05 else 1
+        on_hold = int(rng.random() < 0.03)
+        posting_date = add_days(self.today, -rng.randint(0, 90))
+
+        grand_total = flt(rng.uniform(100, 100_000), 2)
+        rounded_total = rng.choice((0, round(grand_total)))
+        invoice_total = rounded_total or grand_total
+        paid_amount = rng.choice((0, 0, 0, flt(invoice_total * rng.random(), 2)))
+
+        if is_return:
+            grand_total, rounded_total, invoice_total = (
+                -grand_total,
+                -rounded_total,
+                -invoice_total,
+            )
+            paid_amount = 0
+
+        outstanding_amount = flt(invoice_total - paid_amount, 2)
+        term_count = 1 if is_return else rng.choice(self.term_counts)
+        first_due_date = add_days(posting_date, rng.randint(0, 60))
+
+        self.rows["Purchase Invoice"].append(
+            {
+                "name": name,
+                "company": self.company,
+                "supplier": supplier,
+                "supplier_name": supplier,
+                "posting_date": posting_date,
+                "due_date": first_due_date,
+                "currency": self.currency,
+                "conversion_rate": 1,
+                "party_account_currency": self.currency,
+                "credit_to": self.payable_account,
+                "cost_center": self.cost_center,
+                "grand_total": grand_total,
+                "base_grand_total": grand_total,
+                "rounded_total": rounded_total,
+                "base_rounded_total": rounded_total,
+                "outstanding_amount": outstanding_amount,
+                "is_return": is_return,
+                "on_hold": on_hold,
+                "release_date": self.get_release_date() if on_hold else None,
+                "hold_comment": "Benchmark hold" if on_hold else None,
+                "bill_no": f"BILL-{name}",
+                "status": "Draft" if not docstatus else "Unpaid",
+                "docstatus": docstatus,
+            }
+        )
+
+        self.make_terms(name, invoice_total, term_count, first_due_date, docstatus)
+
+        if not docstatus:
+            return
+
+        self.make_ledger_entries(name, supplier, posting_date, invoice_total)
+
+        if paid_amount:
+            self.make_ledger_entries(
+                f"{name}-PAY", supplier, posting_date, -paid_amount, against=name
+            )
+
+        if not is_return and rng.random() < 0.02:
+            self.make_draft_payment(name, supplier, outstanding_amount)
+
+    def make_terms(self, invoice, invoice_total, term_count, first_due_date, docstatus):
+        rng = self.rng
+        term_amount = flt(invoice_total / term_count, 2)
+
+        for idx in range(term_count):
+            due_date = add_days(first_due_date, idx * 30)
+            discount_type = rng.choice((None, None, "Percentage", "Amount"))
+
+            if discount_type == "Percentage":
+                discount = rng.choice((1, 2, 2.5))
+            elif discount_type:
+                discount = flt(rng.uniform(0, 50), 2)
+            else:
+                discount = 0
+
+            self.rows["Payment Schedule"].append(
+                {
+                    "name": f"{invoice}-{idx}",
+                    "parent": invoice,
+                    "parenttype": "Purchase Invoice",
+                    "parentfield": "payment_schedule",
+                    "idx": idx + 1,
+                    "due_date": due_date,
+                    "invoice_portion": flt(100 / term_count, 6),
+                    "payment_amount": term_amount,
+                    "base_payment_amount": term_amount,
+                    "outstanding": term_amount,
+                    "paid_amount": 0,
+                    "discount_date": discount_type
+                    and add_days(due_date, -rng.randint(0, 20)),
+                    "discount_type": discount_type,
+                    "discount": discount,
+                    "docstatus": docstatus,
+                }
+            )
+
+    def make_ledger_entries(
+        self, voucher, supplier, posting_date, amount, against=None
+    ):
+        """
+        Payable GL Entry and Payment Ledger Entry. Positive amount is credited.
+        """
+        voucher_type = "Journal Entry" if against else "Purchase Invoice"
+
+        self.rows["GL Entry"].append(
+            {
+                "name": f"{voucher}-GLE",
+                "posting_date": posting_date,
+                "company": self.company,
+                "account": self.payable_account,
+                "account_currency": self.currency,
+                "party_type": "Supplier",
+                "party": supplier,
+                "cost_center": self.cost_center,
+                "debit": max(-amount, 0),
+                "credit": max(amount, 0),
+                "debit_in_account_currency": max(-amount, 0),
+                "credit_in_account_currency": max(amount, 0),
+                "voucher_type": voucher_type,
+                "voucher_no": voucher,
+                "against_voucher_type": "Purchase Invoice",
+                "against_voucher": against or voucher,
+                "is_cancelled": 0,
+                "docstatus": 1,
+            }
+        )
+
+        self.rows["Payment Ledger Entry"].append(
+            {
+                "name": f"{voucher}-PLE",
+                "posting_date": posting_date,
+                "company": self.company,
+                "account_type": "Payable",
+                "account": self.payable_account,
+                "account_currency": self.currency,
+                "party_type": "Supplier",
+                "party": supplier,
+                "voucher_type": voucher_type,
+                "voucher_no": voucher,
+                "against_voucher_type": "Purchase Invoice",
+                "against_voucher_no": against or voucher,
+                "amount": -amount,
+                "amount_in_account_currency": -amount,
+                "delinked": 0,
+                "docstatus": 1,
+            }
+        )
+
+    def make_draft_payment(self, invoice, supplier, amount):
+        name = f"{PREFIX}-PE-{invoice}"
+
+        self.rows["Payment Entry"].append(
+            {
+                "name": name,
+                "company": self.company,
+                "posting_date": self.today,
+                "payment_type": "Pay",
+                "party_type": "Supplier",
+                "party": supplier,
+                "paid_to": self.payable_account,
+                "paid_amount": amount,
+                "received_amount": amount,
+                "docstatus": 0,
+            }
+        )
+
+        self.rows["Payment Entry Reference"].append(
+            {
+                "name": f"{name}-REF",
+                "parent": name,
+                "parenttype": "Payment Entry",
+                "parentfield": "references",
+                "idx": 1,
+                "reference_doctype": "Purchase Invoice",
+                "reference_name": invoice,
+                "total_amount": amount,
+                "outstanding_amount": amount,
+                "allocated_amount": amount,
+                "docstatus": 0,
+            }
+        )
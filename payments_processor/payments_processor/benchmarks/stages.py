@@ -0,0 +1,176 @@
+"""
+Benchmark for each stage of `PaymentsProcessor` on a synthetic ledger.
+
+Wall time, query count and peak memory of each stage are compared against the
+stored baselines, and the benchmark fails on regressions. Baselines depend on the
+machine, so record them on the machine that runs the benchmark. Stages without a
+baseline are reported with a warning.
+
+Usage:
+    bench --site <site> execute payments_processor.payments_processor.benchmarks.stages.run
+
+To update the stored baselines:
+    bench --site <site> execute payments_processor.payments_processor.benchmarks.stages.run --kwargs "{'update_baselines': True}"
+"""
+
+import json
+import os
+
+import frappe
+
+from payments_processor.payments_processor.benchmarks.ledger import (
+    delete_ledger,
+    make_ledger,
+)
+from payments_processor.payments_processor.utils.automation import (
+    RUN_STAGES,
+    PaymentsProcessor,
+)
+from payments_processor.payments_processor.utils.profiling import StageProfiler
+
+SIZES = (1_000, 10_000, 100_000)
+
+BASELINES_PATH = os.path.join(os.path.dirname(__file__), "baselines.json")
+
+# allowed increase over the baseline: (relative, absolute)
+TOLERANCE = {
+    "duration": (0.25, 0.05),
+    "queries": (0.1, 2),
+    "peak_memory": (0.25, 1024 * 1024),
+}
+
+
+def run(sizes=SIZES, company=None, update_baselines=False, **setting):
+    """
+    :param sizes: Number of Purchase Invoices to benchmark with
+    :param company: Company to create the ledger for. Defaults to the first company.
+    :param update_baselines: Store the results as baselines instead of comparing
+    :param setting: Overrides for the configuration used for the run
+    """
+    company = company or frappe.get_all("Company", pluck="name", limit=1)[0]
+    results = {}
+
+    for size in sizes:
+        try:
+            make_ledger(int(size), company)
+            results[str(size)] = profile_stages(get_setting(company, **setting))
+
+        finally:
+            frappe.db.rollback()
+            delete_ledger()
+            frappe.db.commit()
+
+        print_results(size, results[str(size)])
+
+    if update_baselines:
+        baselines = get_baselines()
+        baselines.update(results)
+
+        with open(BASELINES_PATH, "w") as f:
+            f.write(frappe.as_json(baselines))
+
+        return
+
+    baselines = get_baselines()
+
+    for missing in get_missing_baselines(results, baselines):
+        print(
+            f"Warning: no baseline for {missing}, run with update_baselines to record it"
+        )
+
+    if regressions := get_regressions(results, baselines):
+        frappe.throw("<br>".join(regressions), title="Performance Regressions")
+
+
+def profile_stages(setting):
+    processor = PaymentsProcessor(setting)
+    profiler = StageProfiler(trace_memory=True)
+
+    with profiler:
+        for stage in RUN_STAGES:
+            with profiler.stage(stage):
+                getattr(processor, stage)()
+
+    return {
+        stage.stage: {
+            "duration": round(stage.duration, 4),
+            "queries": stage.queries,
+            "peak_memory": stage.peak_memory,
+        }
+        for stage in profiler.stages
+    }
+
+
+def get_setting(company, **setting):
+    bank_account = frappe.db.get_value(
+        "Bank Account", {"company": company, "is_company_account": 1, "disabled": 0}
+    )
+
+    if not bank_account:
+        frappe.throw(f"Company Bank Account is required to benchmark {company}")
+
+    return frappe._dict(
+        {
+            "company": company,
+            "bank_account": bank_account,
+            **{f"automate_on_{day}": 1 for day in ("monday", "wednesday", "friday")},
+            "auto_generate_entries": 1,
+            "auto_submit_entries": 1,
+            "limit_payment_to_outstanding": 1,
+            "claim_early_payment_discount": 1,
+            "due_date_offset": 2,
+            "commit_batch_size": 0,
+            **setting,
+        }
+    )
+
+
+def get_baselines():
+    with open(BASELINES_PATH) as f:
+        return json.load(f)
+
+
+def get_missing_baselines(results, baselines):
+    """
+    Stages with a metric that has no baseline, as `<size> invoices | <stage>`.
+    """
+    return [
+        f"{size} invoices | {stage}"
+        for size, stages in results.items()
+        for stage, metrics in stages.items()
+        if not metrics.keys() <= (baselines.get(size, {}).get(stage) or {}).keys()
+    ]
+
+
+def get_regressions(results, baselines):
+    """
+    Metrics that exceed their baseline by more than the tolerance. Metrics
+    without a baseline are skipped (see `get_missing_baselines`).
+    """
+    regressions = []
+
+    for size, stages in results.items():
+        for stage, metrics in stages.items():
+            baseline = baselines.get(size, {}).get(stage) or {}
+
+            for metric, value in metrics.items():
+                if (expected := baseline.get(metric)) is None:
+                    continue
+
+                relative, absolute = TOLERANCE[metric]
+                if value > expected * (1 + relative) + absolute:
+                    regressions.append(
+                        f"{size} invoices | {stage} | {metric}: {value} (baseline: {expected})"
+                    )
+
+    return regressions
+
+
+def print_results(size, stages):
+    print(f"\n{size:,} invoices")
+
+    for stage, metrics in stages.items():
+        print(
+            f"{stage:>28} | {metrics['duration']:9.3f}s | {metrics['queries']:>7} queries"
+            f" | {metrics['peak_memory'] / 1024 / 1024:8.2f} MiB"
+        )
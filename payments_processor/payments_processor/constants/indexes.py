@@ -0,0 +1,16 @@
+# Composite indexes for queries of the processor, that are not in ERPNext.
+# Index names are prefixed to not conflict with indexes of other apps.
+INDEX_PREFIX = "payments_processor"
+
+INDEXES = {
+    # open invoices of the company
+    "Purchase Invoice": [("company", "docstatus", "outstanding_amount")],
+    # payment terms in the due window
+    "Payment Schedule": [("parent", "parenttype", "due_date", "discount_date")],
+    # invoices with draft payment entries
+    "Payment Entry Reference": [("reference_doctype", "docstatus", "reference_name")],
+    # draft payment entries of suppliers
+    "Payment Entry": [("party_type", "party", "docstatus")],
+    "Bank Account": [("party_type", "party", "disabled")],
+    "Dynamic Link": [("link_doctype", "link_name", "parenttype")],
+}
@@ -0,0 +1,172 @@
+# Copyright (c) 2026, Resilient Tech and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import now
+from pypika.terms import ValueWrapper
+
+from payments_processor.constants import CANDIDATE_DOCTYPE
+
+# candidate field -> (table, field) in the Purchase Invoice x Payment Schedule join
+SOURCE_FIELDS = {
+    "name": ("terms", "name"),
+    "purchase_invoice": ("doc", "name"),
+    "company": ("doc", "company"),
+    "supplier": ("doc", "supplier"),
+    "currency": ("doc", "currency"),
+    "bill_no": ("doc", "bill_no"),
+    "contact_person": ("doc", "contact_person"),
+    "is_return": ("doc", "is_return"),
+    "grand_total": ("doc", "grand_total"),
+    "rounded_total": ("doc", "rounded_total"),
+    "outstanding_amount": ("doc", "outstanding_amount"),
+    "on_hold": ("doc", "on_hold"),
+    "release_date": ("doc", "release_date"),
+    "hold_comment": ("doc", "hold_comment"),
+    "due_date": ("terms", "due_date"),
+    "term_outstanding_amount": ("terms", "outstanding"),
+    "discount_date": ("terms", "discount_date"),
+    "discount_type": ("terms", "discount_type"),
+    "discount": ("terms", "discount"),
+}
+
+
+class PaymentsProcessorCandidate(Document):
+    # begin: auto-generated types
+    # This code is auto-generated. Do not modify anything in this block.
+
+    from typing import TYPE_CHECKING
+
+    if TYPE_CHECKING:
+        from frappe.types import DF
+
+        bill_no: DF.Data | None
+        company: DF.Link | None
+        contact_person: DF.Link | None
+        currency: DF.Link | None
+        discount: DF.Float
+        discount_date: DF.Date | None
+        discount_type: DF.Data | None
+        due_date: DF.Date | None
+        grand_total: DF.Currency
+        hold_comment: DF.SmallText | None
+        is_return: DF.Check
+        on_hold: DF.Check
+        outstanding_amount: DF.Currency
+        purchase_invoice: DF.Link | None
+        release_date: DF.Date | None
+        rounded_total: DF.Currency
+        supplier: DF.Link | None
+        term_outstanding_amount: DF.Currency
+    # end: auto-generated types
+
+    pass
+
+
+def on_doctype_update():
+    frappe.db.add_index(CANDIDATE_DOCTYPE, ["company", "due_date"])
+    frappe.db.add_index(CANDIDATE_DOCTYPE, ["company", "discount_date"])
+    frappe.db.add_index(CANDIDATE_DOCTYPE, ["company", "is_return"])
+
+
+### Index Maintenance ###
+
+
+def rebuild_candidates(company: str | None = None):
+    """
+    Rebuild the candidate index from submitted Purchase Invoices.
+
+    :param company: Rebuild only for this company. All companies if not set.
+    """
+    frappe.db.delete(CANDIDATE_DOCTYPE, {"company": company} if company else None)
+
+    query = get_source_query()
+    if company:
+        query = query.where(frappe.qb.DocType("Purchase Invoice").company == company)
+
+    query.run()
+
+
+def update_candidates(invoices: list[str]):
+    """
+    Refresh the candidate rows of the given Purchase Invoices.
+
+    Rows of invoices which are no longer open (cancelled or fully paid) are removed.
+
+    :param invoices: List of Purchase Invoice names
+    """
+    invoices = list({invoice for invoice in invoices if invoice})
+    if not invoices:
+        return
+
+    frappe.db.delete(CANDIDATE_DOCTYPE, {"purchase_invoice": ("in", invoices)})
+
+    doc = frappe.qb.DocType("Purchase Invoice")
+    get_source_query().where(doc.name.isin(invoices)).run()
+
+
+def get_source_query():
+    """
+    Query to insert one candidate per payment term of open Purchase Invoices.
+    """
+    doc = frappe.qb.DocType("Purchase Invoice")
+    terms = frappe.qb.DocType("Payment Schedule")
+    candidate = frappe.qb.DocType(CANDIDATE_DOCTYPE)
+    tables = {"doc": doc, "terms": terms}
+
+    timestamp = now()
+    user = frappe.session.user
+
+    return (
+        frappe.qb.into(candidate)
+        .columns(*SOURCE_FIELDS, "creation", "modified", "owner", "modified_by")
+        .from_(doc)
+        .join(terms)
+        .on((doc.name == terms.parent) & (terms.parenttype == "Purchase Invoice"))
+        .select(
+            *(tables[table][field] for table, field in SOURCE_FIELDS.values()),
+            ValueWrapper(timestamp),
+            ValueWrapper(timestamp),
+            ValueWrapper(user),
+            ValueWrapper(user),
+        )
+        .where(doc.docstatus == 1)
+        .where(doc.outstanding_amount != 0)
+    )
+
+
+### Document Events ###
+
+
+def update_invoice_candidates(doc, method=None):
+    """
+    Purchase Invoice `on_change`.
+
+    Also triggered when the invoice is put on hold or released.
+    """
+    if doc.docstatus == 0:
+        return
+
+    update_candidates([doc.name, doc.return_against])
+
+
+def update_reference_candidates(doc, method=None):
+    """
+    Payment Entry and Journal Entry `on_submit` and `on_cancel`.
+    """
+    if doc.doctype == "Payment Entry":
+        invoices = [
+            row.reference_name
+            for row in doc.references
+            if row.reference_doctype == "Purchase Invoice"
+        ]
+
+    else:
+        invoices = [
+            row.reference_name
+            for row in doc.accounts
+            if row.reference_type == "Purchase Invoice"
+        ]
+
+    update_candidates(invoices)
@@ -0,0 +1,40 @@
+# Copyright (c) 2026, Resilient Tech and Contributors
+# See license.txt
+
+import frappe
+from erpnext.accounts.doctype.purchase_invoice.test_purchase_invoice import (
+    make_purchase_invoice,
+)
+from frappe.tests.utils import FrappeTestCase
+
+from payments_processor.constants import CANDIDATE_DOCTYPE
+from payments_processor.payments_processor.doctype.payments_processor_candidate.payments_processor_candidate import (
+    rebuild_candidates,
+)
+
+
+class TestPaymentsProcessorCandidate(FrappeTestCase):
+    def test_candidates_follow_invoice(self):
+        pi = make_purchase_invoice(rate=500)
+        terms = {row.name for row in pi.payment_schedule}
+
+        self.assertEqual(get_candidates(pi.name), terms)
+
+        pi.reload()
+        pi.cancel()
+        self.assertFalse(get_candidates(pi.name))
+
+    def test_rebuild_candidates(self):
+        pi = make_purchase_invoice(rate=500)
+        frappe.db.delete(CANDIDATE_DOCTYPE, {"purchase_invoice": pi.name})
+
+        rebuild_candidates(pi.company)
+        self.assertEqual(
+            get_candidates(pi.name), {row.name for row in pi.payment_schedule}
+        )
+
+
+def get_candidates(invoice):
+    return set(
+        frappe.get_all(CANDIDATE_DOCTYPE, {"purchase_invoice": invoice}, pluck="name")
+    )
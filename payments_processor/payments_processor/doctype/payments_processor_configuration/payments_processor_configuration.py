@@ -5,6 +5,9 @@ import frappe
 from frappe import _
 from frappe.model.document import Document
 
+from payments_processor.payments_processor.utils.automation import get_next_execution
+from payments_processor.payments_processor.utils.report_cache import invalidate_cache
+
 # Auto Payment Setting
 # Payouts not required
 # validate one setting per company is enabled
@@ -44,6 +47,8 @@ class PaymentsProcessorConfiguration(Document):
 
     def validate(self):
         self.set_defaults()
+        self.next_execution = get_next_execution(self)
+
         if not self.auto_generate_entries:
             self.auto_submit_entries = 0
             return
@@ -51,6 +56,12 @@ class PaymentsProcessorConfiguration(Document):
         self.validate_default_discount_account()
         self.validate_automation_days()
 
+    def on_update(self):
+        invalidate_cache()
+
+    def on_trash(self):
+        invalidate_cache()
+
     def set_defaults(self):
         self.ignore_blocked_suppliers = 1
         self.ignore_blocked_invoices = 1
@@ -0,0 +1,55 @@
+# Copyright (c) 2026, Resilient Tech and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.query_builder import Interval
+from frappe.query_builder.functions import Now
+
+from payments_processor.constants import RUN_DOCTYPE
+
+
+class PaymentsProcessorRun(Document):
+    # begin: auto-generated types
+    # This code is auto-generated. Do not modify anything in this block.
+
+    from typing import TYPE_CHECKING
+
+    if TYPE_CHECKING:
+        from frappe.types import DF
+
+        from payments_processor.payments_processor.doctype.payments_processor_run_stage.payments_processor_run_stage import (
+            PaymentsProcessorRunStage,
+        )
+
+        company: DF.Link | None
+        configuration: DF.Link | None
+        duration: DF.Float
+        end: DF.Datetime | None
+        invalid_invoices: DF.Int
+        invoices_fetched: DF.Int
+        payment_entries_created: DF.Int
+        payment_entries_submitted: DF.Int
+        query_count: DF.Int
+        stages: DF.Table[PaymentsProcessorRunStage]
+        start: DF.Datetime | None
+        valid_invoices: DF.Int
+    # end: auto-generated types
+
+    @staticmethod
+    def clear_old_logs(days=180):
+        run = frappe.qb.DocType(RUN_DOCTYPE)
+        stage = frappe.qb.DocType("Payments Processor Run Stage")
+
+        runs = (
+            frappe.qb.from_(run)
+            .select(run.name)
+            .where(run.creation < (Now() - Interval(days=days)))
+            .run(pluck=True)
+        )
+
+        if not runs:
+            return
+
+        frappe.db.delete(stage, filters=stage.parent.isin(runs))
+        frappe.db.delete(run, filters=run.name.isin(runs))
@@ -0,0 +1,103 @@
+# Copyright (c) 2026, Resilient Tech and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_days, now_datetime
+
+from payments_processor.constants import RUN_DOCTYPE
+from payments_processor.payments_processor.benchmarks.columnar import get_processor
+from payments_processor.payments_processor.doctype.payments_processor_run.payments_processor_run import (
+    PaymentsProcessorRun,
+)
+from payments_processor.payments_processor.utils.profiling import StageProfiler
+from payments_processor.payments_processor.utils.records import Invoice
+
+COMPANY = "_Test Company"
+
+
+class TestPaymentsProcessorRun(FrappeTestCase):
+    def test_log_run(self):
+        processor = get_processor(COMPANY)
+        processor.invoices = {f"PI-{idx}": None for idx in range(5)}
+        processor.processed_invoices = {
+            "valid": {
+                "_Test Supplier": [
+                    # invoices paid by the same payment entry
+                    Invoice(payment_entry="PE-1", pe_status="Submitted"),
+                    Invoice(payment_entry="PE-1", pe_status="Submitted"),
+                    Invoice(payment_entry="PE-2", pe_status="Draft"),
+                ],
+                "_Test Supplier 1": [Invoice()],
+            },
+            "invalid": {"_Test Supplier 2": [Invoice()]},
+        }
+
+        profiler = StageProfiler()
+
+        with profiler:
+            with profiler.stage("get_invoices"):
+                frappe.db.sql("select 1")
+
+            with profiler.stage("create_payments"):
+                frappe.db.sql("select 1")
+                frappe.db.sql("select 1")
+
+        processor.log_run(profiler.stages)
+
+        run = frappe.get_last_doc(RUN_DOCTYPE, {"company": COMPANY})
+
+        self.assertEqual(run.invoices_fetched, 5)
+        self.assertEqual(run.valid_invoices, 4)
+        self.assertEqual(run.invalid_invoices, 1)
+        self.assertEqual(run.payment_entries_created, 2)
+        self.assertEqual(run.payment_entries_submitted, 1)
+        self.assertEqual(run.query_count, 3)
+
+        self.assertEqual(
+            [(stage.stage, stage.queries) for stage in run.stages],
+            [("get_invoices", 1), ("create_payments", 2)],
+        )
+        self.assertAlmostEqual(
+            run.duration, sum(stage.duration for stage in profiler.stages), places=6
+        )
+        self.assertEqual(run.start, profiler.stages[0].start)
+        self.assertEqual(run.end, profiler.stages[-1].end)
+
+    def test_clear_old_logs(self):
+        old_run = make_run()
+        recent_run = make_run()
+
+        frappe.db.set_value(
+            RUN_DOCTYPE,
+            old_run.name,
+            "creation",
+            add_days(now_datetime(), -181),
+            update_modified=False,
+        )
+
+        PaymentsProcessorRun.clear_old_logs()
+
+        self.assertFalse(frappe.db.exists(RUN_DOCTYPE, old_run.name))
+        self.assertFalse(
+            frappe.db.exists("Payments Processor Run Stage", {"parent": old_run.name})
+        )
+
+        self.assertTrue(frappe.db.exists(RUN_DOCTYPE, recent_run.name))
+        self.assertTrue(
+            frappe.db.exists(
+                "Payments Processor Run Stage", {"parent": recent_run.name}
+            )
+        )
+
+
+def make_run():
+    return frappe.get_doc(
+        {
+            "doctype": RUN_DOCTYPE,
+            "company": COMPANY,
+            "start": now_datetime(),
+            "end": now_datetime(),
+            "stages": [{"stage": "get_invoices", "duration": 0.1, "queries": 1}],
+        }
+    ).insert(ignore_permissions=True)
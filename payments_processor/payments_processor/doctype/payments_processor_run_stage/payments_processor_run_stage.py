@@ -0,0 +1,26 @@
+# Copyright (c) 2026, Resilient Tech and contributors
+# For license information, please see license.txt
+
+from frappe.model.document import Document
+
+
+class PaymentsProcessorRunStage(Document):
+    # begin: auto-generated types
+    # This code is auto-generated. Do not modify anything in this block.
+
+    from typing import TYPE_CHECKING
+
+    if TYPE_CHECKING:
+        from frappe.types import DF
+
+        duration: DF.Float
+        end: DF.Datetime | None
+        parent: DF.Data
+        parentfield: DF.Data
+        parenttype: DF.Data
+        queries: DF.Int
+        stage: DF.Data | None
+        start: DF.Datetime | None
+    # end: auto-generated types
+
+    pass
@@ -0,0 +1,22 @@
+// Copyright (c) 2026, Resilient Tech and contributors
+// For license information, please see license.txt
+
+frappe.query_reports["Payment Forecast"] = {
+	filters: [
+		{
+			fieldname: "company",
+			label: __("Company"),
+			fieldtype: "Link",
+			options: "Company",
+			default: frappe.defaults.get_user_default("Company"),
+			reqd: 1,
+		},
+		{
+			fieldname: "payment_dates",
+			label: __("Payment Dates"),
+			fieldtype: "Int",
+			default: 12,
+			reqd: 1,
+		},
+	],
+};
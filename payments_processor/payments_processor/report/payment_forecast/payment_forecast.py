@@ -0,0 +1,106 @@
+# Copyright (c) 2026, Resilient Tech and contributors
+# For license information, please see license.txt
+
+from collections import defaultdict
+
+from frappe import _
+
+from payments_processor.payments_processor.utils.forecast import (
+    get_payment_forecast,
+)
+
+
+def execute(filters: dict | None = None):
+    forecast = get_payment_forecast(
+        filters.get("company"), filters.get("payment_dates")
+    )
+
+    return get_columns(), get_data(forecast), None, get_chart(forecast)
+
+
+def get_columns() -> list[dict]:
+    return [
+        {
+            "label": _("Payment Date"),
+            "fieldname": "payment_date",
+            "fieldtype": "Date",
+        },
+        {
+            "label": _("Supplier"),
+            "fieldname": "supplier",
+            "fieldtype": "Link",
+            "options": "Supplier",
+            "width": 200,
+        },
+        {
+            "label": _("Purchase Invoice"),
+            "fieldname": "name",
+            "fieldtype": "Link",
+            "options": "Purchase Invoice",
+            "width": 200,
+        },
+        {
+            "label": _("Due Date"),
+            "fieldname": "due_date",
+            "fieldtype": "Date",
+        },
+        {
+            "label": _("Amount to Pay"),
+            "fieldname": "amount_to_pay",
+            "fieldtype": "Currency",
+        },
+        {
+            "label": _("Discount"),
+            "fieldname": "total_discount",
+            "fieldtype": "Currency",
+        },
+        {
+            "label": _("Auto Generate"),
+            "fieldname": "auto_generate",
+            "fieldtype": "Check",
+        },
+        {
+            "label": _("Auto Submit"),
+            "fieldname": "auto_submit",
+            "fieldtype": "Check",
+        },
+        {
+            "label": _("Reason Code"),
+            "fieldname": "reason_code",
+            "fieldtype": "Data",
+        },
+        {
+            "label": _("Reason"),
+            "fieldname": "reason",
+            "fieldtype": "Data",
+        },
+    ]
+
+
+def get_data(forecast) -> list[dict]:
+    data = [invoice for payments in forecast for invoice in payments.invoices]
+    data.sort(key=lambda row: row.payment_date)
+
+    return data
+
+
+def get_chart(forecast) -> dict:
+    """
+    Amount to be paid by auto generated payments on each payment date.
+    """
+    totals = defaultdict(float)
+    for payments in forecast:
+        totals[payments.payment_date] += payments.amount_to_pay
+
+    dates = sorted(totals)
+
+    return {
+        "data": {
+            "labels": [str(date) for date in dates],
+            "datasets": [
+                {"name": _("Amount to Pay"), "values": [totals[date] for date in dates]}
+            ],
+        },
+        "type": "bar",
+        "fieldtype": "Currency",
+    }
@@ -7,6 +7,7 @@ from frappe.utils import getdate
 
 from payments_processor.constants import CONFIGURATION_DOCTYPE
 from payments_processor.payments_processor.utils.automation import PaymentsProcessor
+from payments_processor.payments_processor.utils.report_cache import get_cached_result
 
 
 def execute(filters: dict | None = None):
@@ -91,18 +92,23 @@ def get_data(filters) -> list[list]:
     if not auto_pay_settings:
         frappe.throw(_("Payments Processor Configuration not found for this company"))
 
-    data = []
+    def get_processed_invoices():
+        data = []
 
-    for setting in auto_pay_settings:
-        processed = PaymentsProcessor(setting, filters).process_invoices()
+        for setting in auto_pay_settings:
+            processed = PaymentsProcessor(setting, filters).process_invoices()
 
-        for invoices in processed.get("valid", {}).values():
-            data.extend(invoices)
+            for invoices in processed.get("valid", {}).values():
+                data.extend(invoice.as_dict() for invoice in invoices)
 
-        for invoices in processed.get("invalid", {}).values():
-            data.extend(invoices)
+            for invoices in processed.get("invalid", {}).values():
+                data.extend(invoice.as_dict() for invoice in invoices)
 
-    return data
+        return data
+
+    return get_cached_result(
+        filters.get("company"), filters.get("payment_date"), get_processed_invoices
+    )
 
 
 # TODO: different payable account used in purchase invoice
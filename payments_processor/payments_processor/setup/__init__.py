@@ -4,7 +4,7 @@ from frappe.core.page.permission_manager.permission_manager import (
     remove as remove_role_permissions,
 )
 from frappe.permissions import add_permission, update_permission_property
-from frappe.utils import get_datetime
+from frappe.utils import get_datetime, get_table_name
 
 
 ### After Install Setup ###
@@ -189,6 +189,30 @@ def make_email_templates(email_templates: list[dict]):
         doc.save()
 
 
+def make_indexes(indexes: dict, prefix: str):
+    """
+    Create composite indexes on the given doctypes.
+
+    :param indexes: Dictionary of doctypes with fields of each index.
+    :param prefix: Prefix of index names.
+
+    ---
+    Structure of the `indexes` dictionary:
+    {
+        "Doctype": [("field1", "field2"), ...],
+    }
+
+    Note: Existing indexes will be skipped.
+    """
+    for doctype, doctype_indexes in indexes.items():
+        for fields in doctype_indexes:
+            frappe.db.add_index(doctype, list(fields), get_index_name(fields, prefix))
+
+
+def get_index_name(fields: tuple, prefix: str):
+    return f"{prefix}_{'_'.join(fields)}"
+
+
 ### Before Uninstall Setup ###
 def delete_custom_fields(custom_fields: dict):
     """
@@ -329,3 +353,27 @@ def delete_roles(roles: list[str]):
     :param roles: List of role names to be deleted.
     """
     frappe.db.delete("Role", {"role_name": ("in", roles)})
+
+
+def delete_indexes(indexes: dict, prefix: str):
+    """
+    Delete composite indexes created with `make_indexes`.
+
+    :param indexes: Dictionary of doctypes with fields of each index.
+    :param prefix: Prefix of index names.
+    """
+    for doctype, doctype_indexes in indexes.items():
+        table_name = get_table_name(doctype)
+
+        for fields in doctype_indexes:
+            index_name = get_index_name(fields, prefix)
+
+            if not frappe.db.has_index(table_name, index_name):
+                continue
+
+            if frappe.db.db_type == "postgres":
+                frappe.db.sql_ddl(f'DROP INDEX "{index_name}"')
+            else:
+                frappe.db.sql_ddl(
+                    f"ALTER TABLE `{table_name}` DROP INDEX `{index_name}`"
+                )
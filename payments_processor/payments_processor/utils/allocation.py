@@ -0,0 +1,76 @@
+def allocate_cash_budget(invoices, budget, hard_due_date):
+    """
+    Choose invoices to pay within the cash budget.
+
+    Invoices are paid in the order of `get_payment_order`. An invoice that does
+    not fit in the remaining budget is skipped, and smaller invoices are still
+    considered (greedy knapsack).
+
+    Invoices with nothing to pay (eg: returns) don't use the budget.
+
+    :param invoices: Invoice records with `amount_to_pay`, `total_discount` and
+        `payment_terms`
+    :param budget: Cash available for the run
+    :param hard_due_date: Terms due before this date are past their due date
+        by the payment date
+
+    Returns invoices that could not be paid within the budget, in their given order.
+    """
+    remaining = budget
+    skipped = set()
+
+    for invoice in get_payment_order(invoices, hard_due_date):
+        if invoice.amount_to_pay <= 0:
+            continue
+
+        if invoice.amount_to_pay > remaining:
+            skipped.add(invoice.name)
+            continue
+
+        remaining -= invoice.amount_to_pay
+
+    return [invoice for invoice in invoices if invoice.name in skipped]
+
+
+def get_payment_order(invoices, hard_due_date):
+    """
+    Order in which invoices are paid from the cash budget.
+
+    Invoices with nothing to pay (eg: returns) come first, as they don't use the
+    budget. Invoices with a payment term due before `hard_due_date` must be paid
+    on time, so they follow, in the order of their oldest due term. Invoices that
+    are due only to claim an early payment discount come last, in the order of
+    discount captured per unit of cash paid.
+
+    :param invoices: Invoice records with `amount_to_pay`, `total_discount` and
+        `payment_terms`
+    :param hard_due_date: Terms due before this date are past their due date
+        by the payment date
+    """
+    nothing_to_pay = []
+    hard_due = []
+    discounted = []
+
+    for idx, invoice in enumerate(invoices):
+        if invoice.amount_to_pay <= 0:
+            nothing_to_pay.append(invoice)
+            continue
+
+        due_date = min(term.due_date for term in invoice.payment_terms)
+
+        if due_date < hard_due_date:
+            hard_due.append((due_date, idx, invoice))
+        else:
+            # highest discount per unit of cash first
+            ratio = (invoice.total_discount or 0) / invoice.amount_to_pay
+            discounted.append((-ratio, idx, invoice))
+
+    # invoices are not comparable
+    hard_due.sort(key=lambda row: row[:2])
+    discounted.sort(key=lambda row: row[:2])
+
+    return [
+        *nothing_to_pay,
+        *(invoice for *_, invoice in hard_due),
+        *(invoice for *_, invoice in discounted),
+    ]
@@ -1,5 +1,6 @@
-import calendar
+import multiprocessing
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from functools import cached_property
 
 import frappe
@@ -10,13 +11,74 @@ from erpnext.accounts.utils import get_balance_on
 from frappe import _
 from frappe.core.doctype.role.role import get_info_based_on_role
 from frappe.email.doctype.email_template.email_template import get_email_template
-from frappe.utils import add_days, get_timedelta, getdate, now_datetime
-from pypika import Order
-
-from payments_processor.constants import CONFIGURATION_DOCTYPE
+from frappe.query_builder import Case, Interval
+from frappe.utils import (
+    add_days,
+    cint,
+    flt,
+    get_datetime,
+    get_timedelta,
+    getdate,
+    now_datetime,
+)
+from pypika import CustomFunction, Order
+from pypika.functions import Cast, Extract
+from pypika.terms import ExistsCriterion
+
+from payments_processor.constants import (
+    CANDIDATE_DOCTYPE,
+    CONFIGURATION_DOCTYPE,
+    RUN_DOCTYPE,
+)
 from payments_processor.payments_processor.constants.roles import ROLE_PROFILE
+from payments_processor.payments_processor.utils.allocation import get_payment_order
+from payments_processor.payments_processor.utils.balances import get_party_balances
+from payments_processor.payments_processor.utils.columnar import ColumnarEvaluator
+from payments_processor.payments_processor.utils.lease import LeaseLostError, RunLease
+from payments_processor.payments_processor.utils.payment_calendar import PaymentCalendar
+from payments_processor.payments_processor.utils.profiling import StageProfiler
+from payments_processor.payments_processor.utils.records import Invoice, PaymentTerm
+from payments_processor.payments_processor.utils.supplier_cache import PartyDetailsCache
+
+SUPPLIER_SAVEPOINT = "payments_processor_supplier"
+
+# seconds
+JOB_TIMEOUT = 4 * 60 * 60
+
+# stages of a run, in order
+RUN_STAGES = (
+    "get_invoices",
+    "get_suppliers",
+    "update_supplier_outstanding",
+    "process_auto_generate",
+    "process_auto_submit",
+    "create_payments",
+    "notify_users",
+)
+
+# invoice fields set from the payment entry created for it
+PAYMENT_INFO_FIELDS = (
+    "payment_entry",
+    "paid_amount",
+    "pe_status",
+    "paid_from_account_currency",
+)
+
+# rows in a batch above which due invoices are evaluated using NumPy arrays
+COLUMNAR_EVALUATION_THRESHOLD = 1000
+
+# supplier fields used for validations
+SUPPLIER_FIELDS = (
+    "disabled",
+    "on_hold",
+    "hold_type",
+    "release_date",
+    "disable_auto_generate_payment_entry",
+)
+
+# Monday is 0, as in `date.weekday()` (MariaDB only, see `get_weekday`)
+Weekday = CustomFunction("WEEKDAY", ["date"])
 
-DAY_NAMES = list(calendar.day_name)
 ERRORS = {
     "1000": "Supplier not found",
     "1001": "Supplier is disabled",
@@ -24,6 +86,7 @@ ERRORS = {
     "1003": "Auto generate payment entry is disabled for this supplier",
     "1005": "Supplier has no outstanding balance",
     "1006": "Payment generation threshold exceeded",
+    "1007": "Cash budget exceeded",
     "1021": "Payment submission threshold exceeded",
     "2001": "Payment for this invoice is blocked",
     "2002": "Foreign currency invoice",
@@ -33,54 +96,244 @@ ERRORS = {
 
 
 def autocreate_payment_entry():
-    auto_pay_settings = frappe.get_all(CONFIGURATION_DOCTYPE, "*", {"disabled": 0})
+    """
+    Enqueue a background job for each configuration due for processing.
+
+    Each configuration is processed in a separate job so that a slow company
+    does not delay others. Jobs are deduplicated, so a configuration is never
+    queued again while its job is queued or running.
+    """
+    configurations = frappe.get_all(
+        CONFIGURATION_DOCTYPE,
+        filters={"disabled": 0, "next_execution": ("<=", now_datetime())},
+        fields=["name", "queue"],
+    )
+
+    for configuration in configurations:
+        frappe.enqueue(
+            "payments_processor.payments_processor.utils.automation.process_configuration",
+            queue=configuration.queue or "long",
+            timeout=JOB_TIMEOUT,
+            job_id=f"payments_processor::{configuration.name}",
+            deduplicate=True,
+            configuration=configuration.name,
+        )
 
-    for setting in auto_pay_settings:
-        if not setting.processing_time:
-            continue
 
-        if setting.processing_time > time_now():
-            continue
+def process_configuration(configuration):
+    # guards against concurrent runs of a configuration (eg: from other benches)
+    lease = RunLease(configuration)
+    if not lease.acquire():
+        return
 
-        if setting.last_execution and getdate(setting.last_execution) == getdate():
-            continue
+    try:
+        setting = frappe.db.get_value(
+            CONFIGURATION_DOCTYPE, configuration, "*", as_dict=True
+        )
 
-        PaymentsProcessor(setting).run()
+        # could have changed while the job was queued
+        if not setting or setting.disabled or not is_processing_due(setting):
+            return
 
+        processor = PaymentsProcessor(setting)
+        processor.lease = lease
+        processor.run()
+
+        setting.last_execution = now_datetime()
         frappe.db.set_value(
-            CONFIGURATION_DOCTYPE, setting.name, "last_execution", frappe.utils.now()
+            CONFIGURATION_DOCTYPE,
+            setting.name,
+            {
+                "last_execution": setting.last_execution,
+                "next_execution": get_next_execution(setting),
+            },
+        )
+
+        # last execution must be visible before the lease is released
+        lease.check()
+        frappe.db.commit()
+
+    except LeaseLostError:
+        # another run has taken over, and must not find payments of this one
+        frappe.db.rollback()
+        frappe.log_error(
+            title=f"Payments Processor run of {configuration} aborted",
+            message=frappe.get_traceback(),
         )
 
+    finally:
+        lease.release()
+
+
+def is_processing_due(setting):
+    return bool(
+        setting.next_execution
+        and get_datetime(setting.next_execution) <= now_datetime()
+    )
+
+
+def get_next_execution(setting, after=None):
+    """
+    Datetime at which the configuration is next due for processing.
+
+    This is the processing time on the first automation day from the given date
+    (today by default), skipping the day of the last execution. Can be in the
+    past if processing for the day is pending.
+    """
+    if not setting.processing_time:
+        return
+
+    payment_calendar = PaymentCalendar(setting, start=after)
+    last_execution = setting.last_execution and getdate(setting.last_execution)
 
-def time_now():
-    return get_timedelta(now_datetime().strftime("%H:%M:%S"))
+    date = payment_calendar.get_next(getdate(after), inclusive=True)
+    if date and date == last_execution:
+        date = payment_calendar.get_next(date)
+
+    if not date:
+        return
+
+    return get_datetime(date) + get_timedelta(setting.processing_time)
+
+
+def create_shard_payments(site, sites_path, user, processor, shard, commit_batch_size):
+    """
+    Create payment entries for suppliers of a shard in a payment worker process.
+
+    Workers are spawned, so the site is initialized and connected to here, and
+    destroyed once the shard is done.
+
+    Returns failed suppliers and payment info of invoices of the shard, as
+    invoices updated in the worker are not shared with the parent process.
+    """
+    frappe.init(site, sites_path=sites_path)
+
+    try:
+        frappe.connect()
+        frappe.set_user(user)
+
+        failed = processor.create_supplier_payments(shard, commit_batch_size)
+        return failed, processor.get_payment_info(shard)
+
+    finally:
+        frappe.destroy()
+
+
+def get_weekday(date):
+    """
+    Weekday of a date in a query, with Monday as 0 (as in `date.weekday()`).
+    """
+    if frappe.db.db_type == "postgres":
+        # Monday is 1
+        return Extract("ISODOW", date) - 1
+
+    return Weekday(date)
+
+
+def get_bulk_filter(fn):
+    """
+    Adapt a per-invoice filter hook `fn(supplier, invoice)` to the bulk signature.
+    """
+    fn = frappe.get_attr(fn)
+
+    def bulk_filter(invoices, suppliers):
+        rejected = {}
+
+        for invoice in invoices:
+            supplier = suppliers.get(invoice.supplier)
+            if msg := frappe.call(fn, supplier=supplier, invoice=invoice):
+                rejected[invoice.name] = msg
+
+        return rejected
+
+    return bulk_filter
 
 
 class PaymentsProcessor:
+    """
+    Processes due invoices of a configuration in stages:
+
+    fetch invoice rows -> term aggregation (`get_invoices`) -> supplier master
+    (`get_suppliers`) -> balances (`update_supplier_outstanding`) -> eligibility
+    (`process_auto_generate`) -> auto submit decision (`process_auto_submit`)
+    """
+
     def __init__(self, setting, filters=None):
         self.setting = setting
         self.filters = filters or frappe._dict()
 
         self.today = getdate()
-        self.automation_days = self.get_automation_days()
+        self.calendar = PaymentCalendar(setting)
 
         self.next_payment_date = self.get_next_payment_date()
         self.offset_due_date = add_days(
             self.next_payment_date, -self.setting.due_date_offset
         )
 
+        self.suppliers = {}
+        self.fetched_suppliers = set()
+        self.supplier_balances = {}
+        self.draft_payment_invoices = None
+        self.party_bank_accounts = self.party_contacts = None
+
+        # lease of the run, if processed by `process_configuration`
+        self.lease = None
+
         company = frappe.get_cached_doc("Company", setting.company)
         self.default_currency = company.default_currency
         self.discount_account = company.default_discount_account
 
+    def __getstate__(self):
+        # filter hooks are not picklable, and are not used by payment workers
+        state = self.__dict__.copy()
+        state.pop("filter_hooks", None)
+        return state
+
     def run(self):
-        week_day = self.today.strftime("%A")
-        if week_day not in self.automation_days:
+        if not self.calendar.is_payment_day(self.today):
             return
 
-        self.process_invoices()
-        self.create_payments()
-        self.notify_users()
+        profiler = StageProfiler()
+
+        with profiler:
+            for stage in RUN_STAGES:
+                with profiler.stage(stage):
+                    getattr(self, stage)()
+
+        self.log_run(profiler.stages)
+
+    def log_run(self, stages):
+        """
+        Create a Payments Processor Run with timings of each stage and counts.
+        """
+        processed = getattr(self, "processed_invoices", None) or {}
+        valid = [row for rows in processed.get("valid", {}).values() for row in rows]
+        invalid = [
+            row for rows in processed.get("invalid", {}).values() for row in rows
+        ]
+
+        payment_entries = {row.payment_entry: row.pe_status for row in valid}
+        payment_entries.pop(None, None)
+
+        frappe.get_doc(
+            {
+                "doctype": RUN_DOCTYPE,
+                "configuration": self.setting.name,
+                "company": self.setting.company,
+                "start": stages[0].start,
+                "end": stages[-1].end,
+                "duration": sum(stage.duration for stage in stages),
+                "query_count": sum(stage.queries for stage in stages),
+                "invoices_fetched": len(self.invoices),
+                "valid_invoices": len(valid),
+                "invalid_invoices": len(invalid),
+                "payment_entries_created": len(payment_entries),
+                "payment_entries_submitted": sum(
+                    status == "Submitted" for status in payment_entries.values()
+                ),
+                "stages": stages,
+            }
+        ).insert(ignore_permissions=True)
 
     def process_invoices(self):
         self.get_invoices()
@@ -120,43 +373,184 @@ class PaymentsProcessor:
                 ...
         }
         """
-        for supplier_name, supplier_invoices in (
-            self.processed_invoices.get("valid", {}).copy().items()
-        ):
+        self.check_lease()
+        self.prefetch_party_details()
+
+        suppliers = list(self.processed_invoices.get("valid", {}))
+        workers = cint(self.setting.payment_entry_workers)
+        commit_batch_size = cint(self.setting.commit_batch_size)
+
+        if workers > 1 and len(suppliers) > 1:
+            failed = self.create_payments_in_parallel(
+                suppliers, workers, commit_batch_size
+            )
+        else:
+            failed = self.create_supplier_payments(suppliers, commit_batch_size)
+
+        for supplier_name in failed:
+            self.handle_pe_creation_failed(supplier_name)
+
+    def create_payments_in_parallel(self, suppliers, workers, commit_batch_size=0):
+        """
+        Split suppliers into shards and create their payment entries in parallel
+        worker processes.
+
+        Workers are spawned rather than forked, as the parent runs the lease
+        heartbeat thread and holds a database connection. Each receives a pickled
+        copy of the processor and connects to the database on its own (see
+        `create_shard_payments`). A worker commits after every `commit_batch_size`
+        suppliers (every supplier if not set), since uncommitted payment entries
+        hold the naming series lock.
+
+        Returns suppliers for which payment entry creation failed.
+        """
+        workers = min(workers, len(suppliers))
+        shards = [suppliers[i::workers] for i in range(workers)]
+
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            futures = [
+                executor.submit(
+                    create_shard_payments,
+                    frappe.local.site,
+                    frappe.local.sites_path,
+                    frappe.session.user,
+                    self,
+                    shard,
+                    commit_batch_size or 1,
+                )
+                for shard in shards
+            ]
+
+            results = [future.result() for future in futures]
+
+        return self.merge_shard_results(results)
+
+    def merge_shard_results(self, results):
+        """
+        Update payment info of invoices from the results of worker processes.
+
+        :param results: List of `(failed suppliers, payment info by invoice)`
+
+        Returns suppliers for which payment entry creation failed.
+        """
+        valid = self.processed_invoices.get("valid", {})
+        payment_info = {}
+        failed = []
+
+        for shard_failed, shard_payment_info in results:
+            failed.extend(shard_failed)
+            payment_info.update(shard_payment_info)
+
+        for invoices in valid.values():
+            for invoice in invoices:
+                if info := payment_info.get(invoice.name):
+                    invoice.update(info)
+
+        return failed
+
+    def get_payment_info(self, suppliers):
+        """
+        Payment info of valid invoices of the given suppliers, by invoice name.
+        """
+        valid = self.processed_invoices.get("valid", {})
+
+        return {
+            invoice.name: {field: invoice.get(field) for field in PAYMENT_INFO_FIELDS}
+            for supplier_name in suppliers
+            for invoice in valid[supplier_name]
+        }
+
+    def create_supplier_payments(self, suppliers, commit_batch_size=0):
+        """
+        Create payment entries for the given suppliers.
+
+        :param suppliers: List of supplier names with valid invoices
+        :param commit_batch_size: Commit after these many suppliers. Zero to not commit.
+
+        Returns suppliers for which payment entry creation failed.
+        """
+        valid = self.processed_invoices.get("valid", {})
+        failed = []
+
+        for idx, supplier_name in enumerate(suppliers, start=1):
+            self.check_lease()
+
+            if not self.create_payments_for_supplier(
+                supplier_name, valid[supplier_name]
+            ):
+                failed.append(supplier_name)
+
+            if commit_batch_size and idx % commit_batch_size == 0:
+                self.check_lease()
+                frappe.db.commit()
+
+        if commit_batch_size:
+            self.check_lease()
+            frappe.db.commit()
+
+        return failed
+
+    def create_payments_for_supplier(self, supplier_name, invoices):
+        """
+        Create payment entries for a supplier within a savepoint.
 
-            def get_invoice_group(invoice_group):
-                if self.setting.group_payments_by_supplier:
-                    return [invoice_group]
+        If any of them fails, all payment entries of the supplier are rolled back,
+        their payment info is cleared from the invoices and `False` is returned.
+        Invoices of failed suppliers are marked invalid by `create_payments`.
+        """
+        frappe.db.savepoint(SUPPLIER_SAVEPOINT)
+
+        try:
+            for invoice_group in self.get_invoice_groups(invoices):
+                pe = self.create_payment_entry(supplier_name, invoice_group)
+
+                frappe.flags.initiated_by_payment_processor = True
+                pe.flags.invoice_list = invoice_group
+                pe.save()
+
+                if invoice_group[0].auto_submit:
+                    pe.submit()
 
-                for invoice in invoice_group:
-                    yield [invoice]
+                self.update_payment_info(invoice_group, pe)
 
-            def update_payment_info(invoice_group, pe):
-                for invoice in invoice_group:
-                    invoice.payment_entry = pe.name
-                    invoice.paid_amount = pe.paid_amount
-                    invoice.pe_status = pe.status
-                    invoice.paid_from_account_currency = pe.paid_from_account_currency
+        except Exception:
+            frappe.db.rollback(save_point=SUPPLIER_SAVEPOINT)
 
-            for invoice_group in get_invoice_group(supplier_invoices):
-                try:
-                    pe = self.create_payment_entry(supplier_name, invoice_group)
+            # payment entries of earlier groups are rolled back as well
+            for invoice in invoices:
+                invoice.update(dict.fromkeys(PAYMENT_INFO_FIELDS))
 
-                    frappe.flags.initiated_by_payment_processor = True
-                    pe.flags.invoice_list = invoice_group
-                    pe.save()
+            frappe.log_error(
+                title=f"Error saving automated payment entry for supplier {supplier_name}",
+                message=frappe.get_traceback(),
+            )
+
+            return False
 
-                    if invoice_group[0].auto_submit:
-                        pe.submit()
+        frappe.db.release_savepoint(SUPPLIER_SAVEPOINT)
+        return True
 
-                    update_payment_info(invoice_group, pe)
+    def get_invoice_groups(self, invoices):
+        if self.setting.group_payments_by_supplier:
+            return [invoices]
 
-                except Exception:
-                    self.handle_pe_creation_failed(supplier_name)
-                    frappe.log_error(
-                        title=f"Error saving automated payment entry for supplier {supplier_name}",
-                        message=frappe.get_traceback(),
-                    )
+        return [[invoice] for invoice in invoices]
+
+    def check_lease(self):
+        """
+        Stop creating payment entries if another run has taken over the lease.
+        """
+        if self.lease:
+            self.lease.check()
+
+    def update_payment_info(self, invoice_group, pe):
+        for invoice in invoice_group:
+            invoice.payment_entry = pe.name
+            invoice.paid_amount = pe.paid_amount
+            invoice.pe_status = pe.status
+            invoice.paid_from_account_currency = pe.paid_from_account_currency
 
     def notify_users(self):
         if not (email_template := self.setting.email_template):
@@ -204,9 +598,111 @@ class PaymentsProcessor:
             ...
         }
         """
+        self.invoices = frappe._dict()
+
+        for rows in self.get_invoice_rows():
+            self.process_invoice_rows(rows)
+
+    def get_invoice_rows(self):
+        """
+        Yield due invoice rows (Purchase Invoice x Payment Schedule) in batches.
+
+        Due payment terms and their invoices are fetched with separate queries
+        (see `get_invoices_query`), and invoice fields are merged into the term rows.
+
+        If `invoice_batch_size` is set, rows are fetched using keyset pagination
+        on `(due_date, name)` of the payment term, so that memory usage depends on
+        the batch size and not on the number of open invoices.
+        """
+        query, terms = self.get_invoices_query()
+        batch_size = cint(self.setting.invoice_batch_size)
+
+        if not batch_size:
+            rows = query.run(as_dict=True)
+            yield self.add_invoice_fields(rows, self.get_invoice_fields())
+            return
+
+        last_due_date = last_name = None
+
+        while True:
+            batch_query = query.limit(batch_size)
+
+            if last_name:
+                batch_query = batch_query.where(
+                    (terms.due_date > last_due_date)
+                    | ((terms.due_date == last_due_date) & (terms.name > last_name))
+                )
+
+            rows = batch_query.run(as_dict=True)
+            if not rows:
+                return
+
+            # rows are updated while processing
+            last_due_date, last_name = rows[-1].term_due_date, rows[-1].term_name
+
+            yield self.add_invoice_fields(
+                rows, self.get_invoice_fields({row.name for row in rows})
+            )
+
+            if len(rows) < batch_size:
+                return
+
+    def get_invoices_query(self):
+        """
+        Query for due payment term rows and the table holding payment term fields
+        (`due_date` and `name`) used for keyset pagination.
+
+        Only payment term fields are selected, so that invoice fields are not
+        repeated for each term (see `get_invoice_fields`).
+        """
+        if self.setting.use_candidate_index:
+            return self.get_candidates_query()
+
+        doc = frappe.qb.DocType("Purchase Invoice")
+        terms = frappe.qb.DocType("Payment Schedule")
+
+        query = (
+            frappe.qb.from_(doc)
+            .join(terms)
+            .on((doc.name == terms.parent) & (terms.parenttype == "Purchase Invoice"))
+            .select(
+                terms.parent.as_("name"),
+                terms.name.as_("term_name"),
+                terms.due_date.as_("term_due_date"),
+                terms.outstanding.as_("term_outstanding_amount"),
+                terms.discount_date.as_("term_discount_date"),
+                terms.discount_type.as_("term_discount_type"),
+                terms.discount.as_("term_discount"),
+            )
+            .where(self.get_invoice_condition(doc, terms))
+            .orderby(terms.due_date, order=Order.asc)
+            .orderby(terms.name, order=Order.asc)
+        )
+
+        if self.setting.compute_due_in_query:
+            query = query.select(self.get_payment_date_column(doc, terms))
+
+        return query, terms
+
+    def get_invoice_fields(self, names=None):
+        """
+        Fields of invoices with due payment terms, by invoice name.
+
+        :param names: Invoices to fetch. Defaults to all invoices with due terms.
+        """
+        if self.setting.use_candidate_index:
+            # candidate rows include invoice fields
+            return
+
+        query = self.get_invoice_fields_query(names)
+
+        return {row.name: row for row in query.run(as_dict=True)}
+
+    def get_invoice_fields_query(self, names=None):
         doc = frappe.qb.DocType("Purchase Invoice")
         terms = frappe.qb.DocType("Payment Schedule")
-        invoices = (
+
+        query = (
             frappe.qb.from_(doc)
             .join(terms)
             .on((doc.name == terms.parent) & (terms.parenttype == "Purchase Invoice"))
@@ -224,122 +720,349 @@ class PaymentsProcessor:
                 doc.on_hold,
                 doc.hold_comment,
                 doc.release_date,
-                terms.due_date.as_("term_due_date"),
-                terms.outstanding.as_("term_outstanding_amount"),
-                terms.discount_date.as_("term_discount_date"),
-                terms.discount_type.as_("term_discount_type"),
-                terms.discount.as_("term_discount"),
-            )
-            .where(doc.docstatus == 1)
-            .where(doc.outstanding_amount != 0)
-            .where(doc.company == self.setting.company)
-            .where(  # invoice is due
-                (doc.is_return == 1)  # immediately claim refund for returns
-                | ((doc.is_return == 0) & (terms.due_date < self.offset_due_date))
-                | (
-                    (doc.is_return == 0)
-                    & (terms.discount_date.notnull())
-                    & (terms.discount_date < self.next_payment_date)
-                )
             )
-            .orderby(terms.due_date, order=Order.asc)
-            .run(as_dict=True)
+            .distinct()
+            .where(self.get_invoice_condition(doc, terms))
         )
 
-        self.invoices = frappe._dict()
+        query = self.join_supplier_checks(query, doc, doc.name)
 
-        for row in invoices:
-            if not self.is_invoice_due(row):
-                continue
+        if names is not None:
+            query = query.where(doc.name.isin(list(names)))
 
-            # TODO: use flt where necessary
-            invoice_total = row.rounded_total or row.grand_total
-            paid_amount = invoice_total - row.outstanding_amount
+        return query
 
-            payment_term = frappe._dict(
-                {
-                    "due_date": row.pop("term_due_date"),
-                    "outstanding_amount": row.pop("term_outstanding_amount"),
-                    "discount_date": row.pop("term_discount_date"),
-                    "discount_type": row.pop("term_discount_type"),
-                    "discount": row.pop("term_discount"),
-                }
+    def join_supplier_checks(self, query, doc, invoice):
+        """
+        Join supplier fields and draft payment entries to the invoice query, so
+        that suppliers and draft payment entries are not fetched separately
+        (see `add_supplier_checks`).
+
+        :param doc: Table with `supplier` field
+        :param invoice: Purchase Invoice name field of the table
+        """
+        supplier = frappe.qb.DocType("Supplier")
+
+        return (
+            query.left_join(supplier)
+            .on(supplier.name == doc.supplier)
+            .select(
+                Case().when(supplier.name.notnull(), 1).else_(0).as_("supplier_exists"),
+                *(
+                    supplier[field].as_(f"supplier_{field}")
+                    for field in SUPPLIER_FIELDS
+                ),
+                Case()
+                .when(ExistsCriterion(self.get_draft_payments_query(invoice)), 1)
+                .else_(0)
+                .as_("has_draft_payment_entry"),
             )
+        )
 
-            updated = self.invoices.setdefault(
-                row.name,
-                frappe._dict(
+    def get_draft_payments_query(self, invoice):
+        """
+        Draft payment entries of the company to suppliers, referencing the invoice.
+        Correlated to the invoice query, so that only references of fetched
+        invoices are read.
+
+        :param invoice: Purchase Invoice name field of the invoice query
+        """
+        pe = frappe.qb.DocType("Payment Entry")
+        reference = frappe.qb.DocType("Payment Entry Reference")
+
+        return (
+            frappe.qb.from_(reference)
+            .join(pe)
+            .on(pe.name == reference.parent)
+            .select(reference.name)
+            .where(reference.reference_doctype == "Purchase Invoice")
+            .where(reference.reference_name == invoice)
+            .where(reference.docstatus == 0)
+            .where(pe.company == self.setting.company)
+            .where(pe.payment_type == "Pay")
+            .where(pe.party_type == "Supplier")
+        )
+
+    def add_supplier_checks(self, rows):
+        """
+        Add suppliers and invoices with draft payment entries from the invoice
+        rows. Suppliers that are not found are not fetched again.
+        """
+        if self.draft_payment_invoices is None:
+            self.draft_payment_invoices = set()
+
+        for row in rows:
+            if row.has_draft_payment_entry:
+                self.draft_payment_invoices.add(row.name)
+
+            if row.supplier in self.fetched_suppliers:
+                continue
+
+            self.fetched_suppliers.add(row.supplier)
+
+            if row.supplier_exists:
+                self.suppliers[row.supplier] = frappe._dict(
                     {
-                        **row,
-                        "total_outstanding_due": -paid_amount,
-                        "total_discount": 0,
+                        "name": row.supplier,
+                        **{
+                            field: row[f"supplier_{field}"] for field in SUPPLIER_FIELDS
+                        },
                     }
-                ),
+                )
+
+    def add_invoice_fields(self, rows, invoices):
+        """
+        Merge invoice fields into due payment term rows, in a single pass.
+
+        Terms of invoices that are no longer due (eg: paid between the queries)
+        are skipped.
+        """
+        self.add_supplier_checks(rows if invoices is None else invoices.values())
+
+        if invoices is None:
+            return rows
+
+        merged = []
+
+        for row in rows:
+            if (invoice := invoices.get(row.name)) is not None:
+                row.update(invoice)
+                merged.append(row)
+
+        return merged
+
+    def get_invoice_condition(self, doc, terms):
+        """
+        Open invoices of the company with payment terms in the due window.
+        Shared by the payment term and invoice queries.
+        """
+        return (
+            (doc.docstatus == 1)
+            & (doc.outstanding_amount != 0)
+            & (doc.company == self.setting.company)
+            & self.get_due_condition(doc, terms)
+        )
+
+    def get_candidates_query(self):
+        """
+        Same as the invoice query, but reads the maintained candidate index.
+        """
+        candidate = frappe.qb.DocType(CANDIDATE_DOCTYPE)
+
+        query = (
+            frappe.qb.from_(candidate)
+            .select(
+                candidate.purchase_invoice.as_("name"),
+                candidate.company,
+                candidate.supplier,
+                candidate.outstanding_amount,
+                candidate.grand_total,
+                candidate.rounded_total,
+                candidate.currency,
+                candidate.contact_person,
+                candidate.bill_no,
+                candidate.is_return,
+                candidate.on_hold,
+                candidate.hold_comment,
+                candidate.release_date,
+                candidate.name.as_("term_name"),
+                candidate.due_date.as_("term_due_date"),
+                candidate.term_outstanding_amount,
+                candidate.discount_date.as_("term_discount_date"),
+                candidate.discount_type.as_("term_discount_type"),
+                candidate.discount.as_("term_discount"),
+            )
+            .where(candidate.company == self.setting.company)
+            .where(self.get_due_condition(candidate, candidate))
+            .orderby(candidate.due_date, order=Order.asc)
+            .orderby(candidate.name, order=Order.asc)
+        )
+
+        query = self.join_supplier_checks(query, candidate, candidate.purchase_invoice)
+
+        if self.setting.compute_due_in_query:
+            query = query.select(self.get_payment_date_column(candidate, candidate))
+
+        return query, candidate
+
+    def get_due_condition(self, doc, terms):
+        """
+        Due window for payment terms, same as `is_invoice_due`.
+
+        :param doc: Table with `is_return` field
+        :param terms: Table with `due_date` and `discount_date` fields
+        """
+        condition = (doc.is_return == 1) | (  # immediately claim refund for returns
+            (doc.is_return == 0) & (terms.due_date < self.offset_due_date)
+        )
+
+        if self.setting.claim_early_payment_discount:
+            condition |= (
+                (doc.is_return == 0)
+                & (terms.discount_date.notnull())
+                & (terms.discount_date < self.next_payment_date)
             )
 
-            # update total outstanding due based on paid amount
-            term_outstanding = payment_term.outstanding_amount
+        return condition
+
+    def get_payment_date_column(self, doc, terms):
+        """
+        `payment_date` set by `is_invoice_due`, computed in the query.
 
-            if updated.total_outstanding_due < 0:
-                payment_term.outstanding_amount = max(
-                    0, term_outstanding + updated.total_outstanding_due
+        This is the last payment day before the discount date (if applicable) or
+        the due date, using the weekday offsets of the payment calendar, and not
+        before today. Dates falling on holidays are adjusted in
+        `process_invoice_row`.
+
+        :param doc: Table with `is_return` field
+        :param terms: Table with `due_date` and `discount_date` fields
+        """
+        today = Cast(self.today, "DATE")
+        date = terms.due_date
+
+        if self.setting.claim_early_payment_discount:
+            date = (
+                Case()
+                .when(
+                    terms.discount_date.notnull()
+                    & (terms.discount_date < self.next_payment_date),
+                    terms.discount_date,
                 )
+                .else_(terms.due_date)
+            )
+
+        payment_date = Case().when(doc.is_return == 1, today)
+
+        if offsets := [
+            (weekday, offset)
+            for weekday, offset in enumerate(self.calendar.previous_offsets)
+            if offset
+        ]:
+            previous_date = Case()
+
+            for weekday, offset in offsets:
+                # date arithmetic returns a timestamp on Postgres
+                previous_date = previous_date.when(
+                    get_weekday(date) == weekday,
+                    Cast(date - Interval(days=offset), "DATE"),
+                )
+
+            payment_date = payment_date.when(previous_date < today, today).else_(
+                previous_date
+            )
+
+        return payment_date.as_("payment_date")
+
+    def process_invoice_rows(self, rows):
+        # rows computed in the query are all due
+        if (
+            len(rows) >= COLUMNAR_EVALUATION_THRESHOLD
+            and not self.setting.compute_due_in_query
+        ):
+            ColumnarEvaluator(self).process(rows)
+            return
+
+        for row in rows:
+            self.process_invoice_row(row)
+
+    def process_invoice_row(self, row):
+        if self.setting.compute_due_in_query:
+            # previous payment day is a holiday: use the business day index
+            if row.payment_date in self.calendar.holidays:
+                self.is_invoice_due(row)
+
+        elif not self.is_invoice_due(row):
+            return
+
+        # TODO: use flt where necessary
+        payment_term = PaymentTerm.from_row(row)
+
+        if (updated := self.invoices.get(row.name)) is None:
+            invoice_total = row.rounded_total or row.grand_total
+            paid_amount = invoice_total - row.outstanding_amount
 
-            self.apply_discount(payment_term)
+            updated = self.invoices[row.name] = Invoice.from_row(
+                row,
+                total_outstanding_due=-paid_amount,
+                total_discount=0,
+                payment_terms=[],
+            )
+
+        # update total outstanding due based on paid amount
+        term_outstanding = payment_term.outstanding_amount
+
+        if updated.total_outstanding_due < 0:
+            payment_term.outstanding_amount = max(
+                0, term_outstanding + updated.total_outstanding_due
+            )
 
-            updated.due_date = payment_term.due_date
-            updated.total_outstanding_due += term_outstanding
-            updated.total_discount += payment_term.discount_amount
-            updated.setdefault("payment_terms", []).append(payment_term)
+        self.apply_discount(payment_term)
+
+        updated.due_date = payment_term.due_date
+        updated.total_outstanding_due += term_outstanding
+        updated.total_discount += payment_term.discount_amount
+        updated.payment_terms.append(payment_term)
 
     def get_suppliers(self):
+        """
+        Get suppliers of due invoices that are not fetched with the invoices (see
+        `add_supplier_checks`), eg: for rows not fetched by `get_invoice_rows`.
+        """
+        if not (
+            names := {row.supplier for row in self.invoices.values()}
+            - self.fetched_suppliers
+        ):
+            return
+
         suppliers = frappe.get_all(
             "Supplier",
-            filters={"name": ("in", [row.supplier for row in self.invoices.values()])},
-            fields=(
-                "name",
-                "disabled",
-                "on_hold",
-                "hold_type",
-                "release_date",
-                "disable_auto_generate_payment_entry",
-            ),
+            filters={"name": ("in", list(names))},
+            fields=("name", *SUPPLIER_FIELDS),
         )
 
-        self.suppliers = {supplier.name: supplier for supplier in suppliers}
+        self.suppliers.update((supplier.name, supplier) for supplier in suppliers)
+        self.fetched_suppliers.update(names)
 
     def update_supplier_outstanding(self):
-        if not self.setting.limit_payment_to_outstanding:
+        """
+        Balance of suppliers, less draft payment entries.
+        """
+        if not self.setting.limit_payment_to_outstanding or not self.suppliers:
             return
 
+        parties = list(self.suppliers)
+
         # draft payment entries
-        pe_map = frappe._dict(
-            frappe.get_all(
-                "Payment Entry",
-                filters={
-                    "docstatus": 0,
-                    "party_type": "Supplier",
-                    "payment_type": "Pay",
-                    "party": ["in", self.suppliers.keys()],
-                },
-                fields=["party", "sum(paid_amount) as paid_amount"],
-                group_by="party",
-                as_list=True,
-            )
-        )
+        pe_map = frappe._dict(self.get_draft_payment_amounts(parties))
 
         one_year_from_now = add_days(self.today, 365)
 
-        # update outstanding
-        for supplier in self.suppliers.values():
-            outstanding = get_balance_on(
-                date=one_year_from_now,
-                party_type="Supplier",
-                party=supplier.name,
-                company=self.setting.company,
-            )
+        balances = get_party_balances(
+            party_type="Supplier",
+            parties=parties,
+            company=self.setting.company,
+            date=one_year_from_now,
+        )
 
-            supplier.remaining_balance = outstanding * -1 - pe_map.get(supplier.name, 0)
+        # update outstanding
+        for name in parties:
+            outstanding = balances.get(name, 0)
+            self.supplier_balances[name] = outstanding * -1 - pe_map.get(name, 0)
+
+    def get_draft_payment_amounts(self, parties, run=True):
+        return frappe.get_all(
+            "Payment Entry",
+            filters={
+                "docstatus": 0,
+                "party_type": "Supplier",
+                "payment_type": "Pay",
+                "party": ["in", parties],
+            },
+            fields=["party", "sum(paid_amount) as paid_amount"],
+            group_by="party",
+            as_list=True,
+            run=run,
+        )
 
     def process_auto_generate(self):
         if not self.setting.auto_generate_entries:
@@ -351,86 +1074,217 @@ class PaymentsProcessor:
         invalid = self.processed_invoices.setdefault("invalid", frappe._dict())
         valid = self.processed_invoices.setdefault("valid", frappe._dict())
 
-        for invoice in self.invoices.values():
-            supplier = self.suppliers.get(invoice.supplier)
+        rejected, candidates = self.validate_invoices()
+        rejected.update(
+            self.run_filter_hooks("filter_auto_generate_payments", candidates)
+        )
 
-            # supplier validations
-            if not supplier:
-                invalid.setdefault(invoice.supplier, []).append(
-                    {**invoice, **self.get_error_msg("1000")}
-                )
-                continue
+        rejected.update(
+            self.allocate_payments(
+                [invoice for invoice in candidates if invoice.name not in rejected],
+                self.get_cash_budget(),
+            )
+        )
 
-            if msg := self.is_supplier_disabled(supplier):
-                invalid.setdefault(invoice.supplier, []).append({**invoice, **msg})
+        for invoice in self.invoices.values():
+            if msg := rejected.get(invoice.name):
+                invoice.update(msg)
+                invalid.setdefault(invoice.supplier, []).append(invoice)
                 continue
 
-            if msg := self.is_supplier_blocked(supplier):
-                invalid.setdefault(invoice.supplier, []).append({**invoice, **msg})
-                continue
+            self.supplier_paid_amount[invoice.supplier] += invoice.amount_to_pay
 
-            if msg := self.is_auto_generate_disabled(supplier):
-                invalid.setdefault(invoice.supplier, []).append({**invoice, **msg})
-                continue
+            invoice.auto_generate = 1
+            valid.setdefault(invoice.supplier, []).append(invoice)
 
-            # run before outstanding check (for better error message)
-            # since outstanding amount is adjusted based on draft PEs
-            if msg := self.payment_entry_exists(invoice):
-                invalid.setdefault(invoice.supplier, []).append({**invoice, **msg})
-                continue
+    def validate_invoices(self):
+        """
+        Validate invoices for auto generation. Supplier outstanding is allocated
+        later (see `allocate_payments`).
+
+        Returns rejection messages by invoice name, and valid invoices.
+        """
+        # remaining balance is used up while allocating payments
+        for name, balance in self.supplier_balances.items():
+            self.suppliers[name].remaining_balance = balance
+
+        rejected = {}
+        candidates = []
+
+        for invoice in self.invoices.values():
+            if msg := self.validate_auto_generate(invoice):
+                rejected[invoice.name] = msg
+            else:
+                candidates.append(invoice)
+
+        return rejected, candidates
 
-            if msg := self.is_payment_exceeding_supplier_outstanding(supplier, invoice):
-                invalid.setdefault(invoice.supplier, []).append({**invoice, **msg})
+    def allocate_payments(self, invoices, budget):
+        """
+        Allocate supplier outstanding and the cash budget to valid invoices, in a
+        single pass.
+
+        Invoices are considered in the order they are paid from the cash budget
+        (see `get_payment_order`), or in their given order without a budget. An
+        invoice is paid upto the remaining outstanding of its supplier, and uses
+        it up only if it is paid. So outstanding of invoices rejected here is left
+        for later invoices of the supplier.
+
+        Returns rejection messages by invoice name.
+        """
+        rejected = {}
+
+        if self.setting.group_payments_by_supplier:
+            rejected = self.get_grouped_threshold_rejections(invoices)
+            invoices = [invoice for invoice in invoices if invoice.name not in rejected]
+
+        if budget is not None:
+            invoices = get_payment_order(invoices, self.offset_due_date)
+
+        for invoice in invoices:
+            supplier = self.suppliers[invoice.supplier]
+
+            if not (amount := self.get_payable_amount(supplier, invoice)):
+                rejected[invoice.name] = self.get_error_msg("1005")
                 continue
 
+            amount_to_pay = amount - invoice.total_discount
+
             if not self.setting.group_payments_by_supplier and (
-                msg := self.is_auto_generate_threshold_exceeded(invoice.amount_to_pay)
+                msg := self.is_auto_generate_threshold_exceeded(amount_to_pay)
             ):
-                invalid.setdefault(invoice.supplier, []).append({**invoice, **msg})
+                rejected[invoice.name] = msg
                 continue
 
-            # invoice validations
-            if msg := self.is_invoice_blocked(invoice):
-                invalid.setdefault(invoice.supplier, []).append({**invoice, **msg})
-                continue
+            # invoices with nothing to pay (eg: returns) don't use the budget
+            if budget is not None and amount_to_pay > 0:
+                if amount_to_pay > budget:
+                    rejected[invoice.name] = self.get_error_msg("1007")
+                    continue
 
-            if msg := self.exclude_foreign_currency_invoices(invoice):
-                invalid.setdefault(invoice.supplier, []).append({**invoice, **msg})
-                continue
+                budget -= amount_to_pay
 
-            functions = frappe.get_hooks("filter_auto_generate_payments")
-            for fn in functions:
-                if msg := frappe.call(fn, supplier=supplier, invoice=invoice):
-                    invalid.setdefault(invoice.supplier, []).append({**invoice, **msg})
-                    break
+            invoice.amount_to_pay = amount_to_pay
 
-            else:
-                self.supplier_paid_amount[invoice.supplier] += invoice.amount_to_pay
+            if self.setting.limit_payment_to_outstanding:
+                supplier.remaining_balance -= amount
 
-                invoice.auto_generate = 1
-                valid.setdefault(invoice.supplier, []).append(invoice)
+        return rejected
 
-        if not self.setting.group_payments_by_supplier:
+    def get_payable_amount(self, supplier, invoice):
+        """
+        Outstanding of the invoice that can be paid (before discount), upto the
+        remaining outstanding of the supplier if payments are limited to it.
+        """
+        if not self.setting.limit_payment_to_outstanding:
+            return invoice.total_outstanding_due
+
+        return min(invoice.total_outstanding_due, supplier.remaining_balance)
+
+    def get_grouped_threshold_rejections(self, invoices):
+        """
+        Returns rejection messages for invoices of suppliers whose grouped payment
+        exceeds the auto generate threshold.
+
+        Supplier outstanding is used up in the order of the invoices. Invoices
+        that are later rejected only leave more outstanding for other invoices of
+        the supplier, so the grouped payment can't increase.
+        """
+        paid_amounts = defaultdict(int)
+        balances = {}
+
+        for invoice in invoices:
+            amount = invoice.total_outstanding_due
+
+            if self.setting.limit_payment_to_outstanding:
+                balance = balances.setdefault(
+                    invoice.supplier, self.suppliers[invoice.supplier].remaining_balance
+                )
+                amount = min(amount, balance)
+                balances[invoice.supplier] = balance - amount
+
+            if amount:
+                paid_amounts[invoice.supplier] += amount - invoice.total_discount
+
+        exceeded = {
+            supplier_name: {**msg, "auto_generate": 0}
+            for supplier_name, paid_amount in paid_amounts.items()
+            if (msg := self.is_auto_generate_threshold_exceeded(paid_amount))
+        }
+
+        return {
+            invoice.name: exceeded[invoice.supplier]
+            for invoice in invoices
+            if invoice.supplier in exceeded
+        }
+
+    def validate_auto_generate(self, invoice):
+        """
+        Returns error message if the invoice is not valid for auto generation.
+        """
+        supplier = self.suppliers.get(invoice.supplier)
+
+        # supplier validations
+        if not supplier:
+            return self.get_error_msg("1000")
+
+        if msg := self.is_supplier_disabled(supplier):
+            return msg
+
+        if msg := self.is_supplier_blocked(supplier):
+            return msg
+
+        if msg := self.is_auto_generate_disabled(supplier):
+            return msg
+
+        # run before outstanding is allocated (for better error message)
+        # since outstanding amount is adjusted based on draft PEs
+        if msg := self.payment_entry_exists(invoice):
+            return msg
+
+        # invoice validations
+        if msg := self.is_invoice_blocked(invoice):
+            return msg
+
+        if msg := self.exclude_foreign_currency_invoices(invoice):
+            return msg
+
+        # upto the supplier outstanding, when allocated
+        invoice.amount_to_pay = invoice.total_outstanding_due - invoice.total_discount
+
+    def get_cash_budget(self):
+        if self.setting.cash_budget_source == "Manual":
+            return flt(self.setting.cash_budget)
+
+        if self.setting.cash_budget_source != "Bank Balance":
             return
 
-        # Grouped PE
-        for supplier_name, paid_amount in self.supplier_paid_amount.items():
-            supplier = self.suppliers[supplier_name]
+        balance = get_balance_on(
+            account=self.paid_from, date=self.today, company=self.setting.company
+        )
 
-            if msg := self.is_auto_generate_threshold_exceeded(paid_amount):
-                for invoice in valid.pop(supplier_name):
-                    invoice.update({**msg, "auto_generate": 0})
+        # draft payments from the bank account are yet to be paid
+        draft_payments = frappe.get_all(
+            "Payment Entry",
+            filters={
+                "docstatus": 0,
+                "payment_type": "Pay",
+                "paid_from": self.paid_from,
+            },
+            fields=["sum(paid_amount)"],
+            as_list=True,
+        )[0][0]
 
-                invalid.setdefault(supplier_name, []).extend(valid.pop(supplier_name))
+        return max(flt(balance) - flt(draft_payments), 0)
 
     def process_auto_submit(self):
         if not self.setting.auto_submit_entries:
             return
 
-        for supplier_name, invoice_list in self.processed_invoices.get(
-            "valid", {}
-        ).items():
-            supplier = self.suppliers[supplier_name]
+        valid = self.processed_invoices.get("valid", {})
+        candidates = []
+
+        for invoice_list in valid.values():
             for invoice in invoice_list:
                 if not self.setting.group_payments_by_supplier and (
                     msg := self.is_auto_submit_threshold_exceeded(invoice.amount_to_pay)
@@ -438,25 +1292,61 @@ class PaymentsProcessor:
                     invoice.update(msg)
                     continue
 
-                functions = frappe.get_hooks("filter_auto_submit_payments")
-                for fn in functions:
-                    if msg := frappe.call(fn, supplier=supplier, invoice=invoice):
-                        invoice.update(msg)
-                        break
+                candidates.append(invoice)
 
-                else:
-                    invoice.auto_submit = 1
+        rejected = self.run_filter_hooks("filter_auto_submit_payments", candidates)
 
-            if not self.setting.group_payments_by_supplier:
-                continue
+        for invoice in candidates:
+            if msg := rejected.get(invoice.name):
+                invoice.update(msg)
+            else:
+                invoice.auto_submit = 1
+
+        if not self.setting.group_payments_by_supplier:
+            return
 
-            # Grouped PE
+        # Grouped PE
+        for supplier_name, invoice_list in valid.items():
             paid_amount = self.supplier_paid_amount[supplier_name]
 
             if msg := self.is_auto_submit_threshold_exceeded(paid_amount):
                 for invoice in invoice_list:
                     invoice.update({**msg, "auto_submit": 0})
 
+    def run_filter_hooks(self, hook, invoices):
+        """
+        Run filter hooks for the given invoices.
+
+        Bulk hooks (`bulk_<hook>`) are called once with all invoices, followed by
+        per-invoice hooks (`<hook>`). Invoices rejected by a hook are not passed to
+        the subsequent hooks.
+
+        Returns rejection messages by invoice name.
+        """
+        rejected = {}
+
+        for fn in self.get_filter_hooks(hook):
+            if pending := [
+                invoice for invoice in invoices if invoice.name not in rejected
+            ]:
+                rejected.update(fn(invoices=pending, suppliers=self.suppliers) or {})
+
+        return rejected
+
+    def get_filter_hooks(self, hook):
+        """
+        Resolve filter hooks once per run, as bulk functions.
+        """
+        if not hasattr(self, "filter_hooks"):
+            self.filter_hooks = {}
+
+        if hook not in self.filter_hooks:
+            self.filter_hooks[hook] = [
+                frappe.get_attr(fn) for fn in frappe.get_hooks(f"bulk_{hook}")
+            ] + [get_bulk_filter(fn) for fn in frappe.get_hooks(hook)]
+
+        return self.filter_hooks[hook]
+
     def create_payment_entry(self, supplier_name, invoice_list):
         pe = frappe.new_doc("Payment Entry")
 
@@ -573,22 +1463,6 @@ class PaymentsProcessor:
 
         return self.get_error_msg("1003")
 
-    def is_payment_exceeding_supplier_outstanding(self, supplier, invoice):
-        if not self.setting.limit_payment_to_outstanding:
-            invoice.amount_to_pay = (
-                invoice.total_outstanding_due - invoice.total_discount
-            )
-            return
-
-        if amount_to_pay := min(
-            invoice.total_outstanding_due, supplier.remaining_balance
-        ):
-            invoice.amount_to_pay = amount_to_pay - invoice.total_discount
-            supplier.remaining_balance -= amount_to_pay
-            return
-
-        return self.get_error_msg("1005")
-
     def is_auto_generate_threshold_exceeded(self, paid_amount):
         if not self.setting.auto_generate_threshold:
             return
@@ -617,7 +1491,7 @@ class PaymentsProcessor:
         return self.get_error_msg("2002")
 
     def payment_entry_exists(self, invoice):
-        if getattr(self, "draft_payment_invoices", None) is None:
+        if self.draft_payment_invoices is None:
             invoices = frappe.get_all(
                 "Payment Entry",
                 filters={
@@ -677,73 +1551,87 @@ class PaymentsProcessor:
         if self.filters.payment_date:
             return getdate(self.filters.payment_date)
 
-        today_index = DAY_NAMES.index(self.today.strftime("%A"))
-
-        for i in range(1, 8):
-            next_day = DAY_NAMES[(today_index + i) % 7]
-            if next_day in self.automation_days:
-                return add_days(self.today, i)
+        return self.calendar.get_next(self.today)
 
     def get_previous_payment_date(self, due_date):
-        due_date_index = DAY_NAMES.index(due_date.strftime("%A"))
-
-        for i in range(1, 8):
-            previous_day = DAY_NAMES[(due_date_index - i) % 7]
-            if previous_day in self.automation_days:
-                # subject to max of today
-                previous_date = add_days(due_date, -i)
-                if previous_date < self.today:
-                    return self.today
+        if not (previous_date := self.calendar.get_previous(due_date)):
+            return
 
-                return previous_date
+        # subject to max of today
+        return max(previous_date, self.today)
 
     @cached_property
     def paid_from(self):
         return frappe.db.get_value("Bank Account", self.setting.bank_account, "account")
 
+    def prefetch_party_details(self):
+        """
+        Load default bank accounts and primary contacts of suppliers with valid
+        invoices, before creating payment entries.
+
+        Details are cached by supplier (see `PartyDetailsCache`), so that
+        configurations processed in the same scheduler tick reuse them. Suppliers
+        without a bank account or contact are cached as well, and only the rest
+        are fetched.
+        """
+        suppliers = list(self.processed_invoices.get("valid", {}))
+        cache = PartyDetailsCache()
+        cached = cache.get_many(suppliers)
+
+        if missing := [name for name in suppliers if name not in cached]:
+            fetched = {name: [None, None] for name in missing}
+
+            # rows are ordered by priority
+            for party, bank_account in self.get_party_bank_accounts(missing):
+                fetched[party][0] = fetched[party][0] or bank_account
+
+            for party, contact in self.get_party_contacts(missing):
+                fetched[party][1] = fetched[party][1] or contact
+
+            cache.set_many(fetched)
+            cached.update(fetched)
+
+        self.party_bank_accounts = {name: cached[name][0] for name in suppliers}
+        self.party_contacts = {name: cached[name][1] for name in suppliers}
+
     def get_party_bank_account(self, supplier_name):
-        if not getattr(self, "party_bank_accounts", None):
-            suppliers = self.processed_invoices.get("valid", {}).keys()
-
-            self.party_bank_accounts = frappe._dict(
-                frappe.get_all(
-                    "Bank Account",
-                    filters={
-                        "party_type": "Supplier",
-                        "party": ("in", suppliers),
-                        "disabled": 0,
-                    },
-                    fields=["party", "name"],
-                    order_by="is_default",
-                    as_list=True,
-                )
-            )
+        if self.party_bank_accounts is None:
+            self.prefetch_party_details()
 
         return self.party_bank_accounts.get(supplier_name)
 
+    def get_party_bank_accounts(self, suppliers, run=True):
+        return frappe.get_all(
+            "Bank Account",
+            filters={
+                "party_type": "Supplier",
+                "party": ("in", suppliers),
+                "disabled": 0,
+            },
+            fields=["party", "name"],
+            order_by="is_default desc, creation asc",
+            as_list=True,
+            run=run,
+        )
+
     def get_contact_person(self, supplier_name):
-        if not getattr(self, "party_contacts", None):
-            suppliers = self.processed_invoices.get("valid", {}).keys()
-
-            self.party_contacts = frappe._dict(
-                frappe.get_all(
-                    "Contact",
-                    filters={
-                        "link_doctype": "Supplier",
-                        "link_name": ("in", suppliers),
-                    },
-                    fields=["`tabDynamic Link`.link_name", "name"],
-                    order_by="is_primary_contact",
-                    as_list=True,
-                )
-            )
+        if self.party_contacts is None:
+            self.prefetch_party_details()
 
         return self.party_contacts.get(supplier_name)
 
+    def get_party_contacts(self, suppliers, run=True):
+        return frappe.get_all(
+            "Contact",
+            filters={
+                "link_doctype": "Supplier",
+                "link_name": ("in", suppliers),
+            },
+            fields=["`tabDynamic Link`.link_name", "name"],
+            order_by="`tabContact`.is_primary_contact desc, `tabContact`.creation asc",
+            as_list=True,
+            run=run,
+        )
+
     def get_error_msg(self, code):
         return {"reason": ERRORS.get(code), "reason_code": code}
-
-    def get_automation_days(self):
-        return [
-            day for day in DAY_NAMES if self.setting.get(f"automate_on_{day.lower()}")
-        ]
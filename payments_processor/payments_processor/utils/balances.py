@@ -0,0 +1,83 @@
+import frappe
+from erpnext.accounts.utils import (
+    FiscalYearError,
+    get_currency_precision,
+    get_fiscal_year,
+)
+from frappe.query_builder.functions import Round, Sum
+from frappe.utils import create_batch, flt, getdate, nowdate
+
+BALANCE_QUERY_BATCH_SIZE = 1000
+
+
+def get_party_balances(
+    party_type: str,
+    parties: list[str],
+    company: str,
+    date=None,
+    batch_size: int = BALANCE_QUERY_BATCH_SIZE,
+) -> dict[str, float]:
+    """
+    Get balances (in account currency) for multiple parties on the given date.
+
+    Returns the same values as `erpnext.accounts.utils.get_balance_on` called
+    for each party, but computes them with one grouped GL Entry query per batch.
+
+    :param party_type: Party Type (eg. `Supplier`)
+    :param parties: List of party names
+    :param company: Company for which balances are computed
+    :param date: Balances as on this date (inclusive). Defaults to today.
+    :param batch_size: Maximum number of parties per query
+
+    Structure of the returned dictionary:
+    ```py
+    {
+        "Party 1": 1000.0,
+        "Party 2": -500.0,
+        ...
+    }
+    ```
+
+    Note: Parties without GL Entries are not part of the result.
+    """
+    if not parties:
+        return {}
+
+    date = date or nowdate()
+
+    # same fiscal year handling as `get_balance_on`
+    try:
+        get_fiscal_year(date, company=company, verbose=0)
+    except FiscalYearError:
+        if getdate(date) <= getdate(nowdate()):
+            # date is older than any existing fiscal year
+            return {}
+
+        get_fiscal_year(nowdate(), verbose=1)
+
+    precision = get_currency_precision()
+    gle = frappe.qb.DocType("GL Entry")
+    balances = {}
+
+    for batch in create_batch(list(parties), batch_size):
+        rows = (
+            frappe.qb.from_(gle)
+            .select(
+                gle.party,
+                (
+                    Sum(Round(gle.debit_in_account_currency, precision))
+                    - Sum(Round(gle.credit_in_account_currency, precision))
+                ).as_("balance"),
+            )
+            .where(gle.is_cancelled == 0)
+            .where(gle.posting_date <= date)
+            .where(gle.company == company)
+            .where(gle.party_type == party_type)
+            .where(gle.party.isin(batch))
+            .groupby(gle.party)
+            .run()
+        )
+
+        balances.update((party, flt(balance)) for party, balance in rows)
+
+    return balances
@@ -0,0 +1,233 @@
+import numpy as np
+
+from payments_processor.payments_processor.utils.records import Invoice, PaymentTerm
+
+# 1970-01-01 (day zero of datetime64) was a Thursday
+EPOCH_WEEKDAY = 3
+
+
+class ColumnarEvaluator:
+    """
+    Columnar evaluation of due invoice rows.
+
+    Due flags, payment dates, term outstanding after adjusting the paid amount and
+    discounts are computed as whole-array operations. Updates `processor.invoices`
+    exactly as `PaymentsProcessor.process_invoice_row` does for each row.
+    """
+
+    def __init__(self, processor):
+        self.processor = processor
+
+    def process(self, rows):
+        if not rows:
+            return
+
+        due = self.get_due_rows(rows)
+        rows = [rows[i] for i in due.pop("index")]
+
+        if not rows:
+            return
+
+        self.update_invoices(rows, **due, **self.get_term_amounts(rows, due))
+
+    def get_due_rows(self, rows):
+        """
+        Vectorized `is_invoice_due`.
+
+        Returns index of due rows with their payment dates and discount flags.
+        """
+        processor = self.processor
+
+        is_return = np.array([bool(row.is_return) for row in rows])
+        due_dates = get_date_array(row.term_due_date for row in rows)
+        discount_dates = get_date_array(row.term_discount_date for row in rows)
+
+        next_payment_date = np.datetime64(processor.next_payment_date, "D")
+        offset_due_date = np.datetime64(processor.offset_due_date, "D")
+        today = np.datetime64(processor.today, "D")
+
+        # NaT comparisons are always False
+        is_discount_applicable = bool(
+            processor.setting.claim_early_payment_discount
+        ) & (discount_dates < next_payment_date)
+        is_past_due = due_dates < offset_due_date
+        is_due = is_return | is_discount_applicable | is_past_due
+
+        payment_dates = self.get_previous_payment_dates(
+            np.where(is_discount_applicable, discount_dates, due_dates)
+        )
+        payment_dates = np.where(is_return, today, np.maximum(payment_dates, today))
+
+        index = np.flatnonzero(is_due)
+
+        return {
+            "index": index,
+            "payment_dates": payment_dates[index],
+            "is_discount_applicable": is_discount_applicable[index],
+        }
+
+    def get_previous_payment_dates(self, dates):
+        """
+        Vectorized `get_previous_payment_date` (without the minimum of today).
+        """
+        calendar = self.processor.calendar
+
+        offsets = np.array(calendar.previous_offsets, dtype="int64")
+        days = dates.astype("int64")
+        weekdays = (days + EPOCH_WEEKDAY) % 7
+
+        previous_dates = (days - offsets[weekdays]).astype("datetime64[D]")
+
+        if calendar.previous_dates is None:
+            return previous_dates
+
+        # dates within the planning horizon, from the business day index
+        index = days - np.datetime64(calendar.start, "D").astype("int64")
+        in_horizon = (index >= 0) & (index < len(calendar.previous_dates))
+        horizon_dates = get_date_array(calendar.previous_dates)
+
+        return np.where(
+            in_horizon, horizon_dates[np.where(in_horizon, index, 0)], previous_dates
+        )
+
+    def get_term_amounts(self, rows, due):
+        """
+        Term outstanding after adjusting the paid amount, and discounts.
+
+        Paid amount is adjusted against payment terms in their order for each
+        invoice. Terms at the same position of all invoices are processed
+        together, to keep the same order of float operations as row-wise
+        processing.
+        """
+        invoices = self.processor.invoices
+        codes = {}
+
+        invoice_codes = np.fromiter(
+            (codes.setdefault(row.name, len(codes)) for row in rows),
+            dtype="int64",
+            count=len(rows),
+        )
+
+        term_outstanding = get_float_array(row.term_outstanding_amount for row in rows)
+        discounts = get_float_array(row.term_discount for row in rows)
+        is_percentage = np.array(
+            [row.term_discount_type == "Percentage" for row in rows]
+        )
+
+        # running totals per invoice
+        first_rows = np.unique(invoice_codes, return_index=True)[1]
+        total_outstanding_due = np.empty(len(codes))
+        total_discount = np.zeros(len(codes))
+
+        for code, row_index in enumerate(first_rows):
+            row = rows[row_index]
+
+            if (existing := invoices.get(row.name)) is not None:
+                total_outstanding_due[code] = existing.total_outstanding_due
+                total_discount[code] = existing.total_discount
+                continue
+
+            invoice_total = row.rounded_total or row.grand_total
+            total_outstanding_due[code] = -(invoice_total - row.outstanding_amount)
+
+        outstanding = term_outstanding.copy()
+        discount_amounts = np.zeros(len(rows))
+
+        for positions in get_term_positions(invoice_codes):
+            codes_at = invoice_codes[positions]
+            running = total_outstanding_due[codes_at]
+            term_amount = term_outstanding[positions]
+
+            adjusted = np.where(
+                running < 0, np.maximum(0, term_amount + running), term_amount
+            )
+
+            discount = np.where(
+                is_percentage[positions],
+                adjusted * discounts[positions] / 100,
+                discounts[positions],
+            )
+            discount = np.where(due["is_discount_applicable"][positions], discount, 0)
+
+            outstanding[positions] = adjusted
+            discount_amounts[positions] = discount
+            total_outstanding_due[codes_at] = running + term_amount
+            total_discount[codes_at] = total_discount[codes_at] + discount
+
+        return {
+            "outstanding": outstanding,
+            "discount_amounts": discount_amounts,
+            "invoice_codes": invoice_codes,
+            "total_outstanding_due": total_outstanding_due,
+            "total_discount": total_discount,
+        }
+
+    def update_invoices(
+        self,
+        rows,
+        payment_dates,
+        is_discount_applicable,
+        outstanding,
+        discount_amounts,
+        invoice_codes,
+        total_outstanding_due,
+        total_discount,
+    ):
+        invoices = self.processor.invoices
+
+        total_outstanding_due = total_outstanding_due.tolist()
+        total_discount = total_discount.tolist()
+
+        for row, payment_date, term_outstanding, discount_amount, code in zip(
+            rows,
+            payment_dates.tolist(),
+            outstanding.tolist(),
+            discount_amounts.tolist(),
+            invoice_codes.tolist(),
+            strict=True,
+        ):
+            payment_term = PaymentTerm.from_row(
+                row,
+                outstanding_amount=term_outstanding,
+                discount_amount=discount_amount,
+            )
+
+            invoice = invoices.get(row.name)
+            if invoice is None:
+                invoice = invoices[row.name] = Invoice.from_row(
+                    row, payment_date=payment_date, payment_terms=[]
+                )
+
+            invoice.due_date = payment_term.due_date
+            invoice.total_outstanding_due = total_outstanding_due[code]
+            invoice.total_discount = total_discount[code]
+            invoice.payment_terms.append(payment_term)
+
+
+def get_term_positions(invoice_codes):
+    """
+    Yield row positions grouped by the position of the term within its invoice.
+
+    eg: codes `[0, 1, 0, 0, 1]` yields `[0, 1]`, `[2, 4]` and `[3]`
+    """
+    order = np.argsort(invoice_codes, kind="stable")
+    sorted_codes = invoice_codes[order]
+
+    is_first = np.ones(len(order), dtype=bool)
+    is_first[1:] = sorted_codes[1:] != sorted_codes[:-1]
+
+    group_start = np.maximum.accumulate(np.where(is_first, np.arange(len(order)), 0))
+    term_index = np.empty(len(order), dtype="int64")
+    term_index[order] = np.arange(len(order)) - group_start
+
+    # stable sort keeps row order within each term position
+    positions = np.argsort(term_index, kind="stable")
+    yield from np.split(positions, np.cumsum(np.bincount(term_index))[:-1])
+
+
+def get_date_array(values):
+    return np.array(list(values), dtype="datetime64[D]")
+
+
+def get_float_array(values):
+    return np.array([value or 0 for value in values], dtype="float64")
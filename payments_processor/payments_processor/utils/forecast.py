@@ -0,0 +1,247 @@
+from bisect import bisect_right
+
+import frappe
+from frappe import _
+from frappe.utils import add_days, cint
+
+from payments_processor.constants import CONFIGURATION_DOCTYPE
+from payments_processor.payments_processor.utils.automation import PaymentsProcessor
+from payments_processor.payments_processor.utils.records import Invoice, PaymentTerm
+
+DEFAULT_PAYMENT_DATES = 12
+MAX_PAYMENT_DATES = 104
+
+
+@frappe.whitelist()
+def get_payment_forecast(company, payment_dates=DEFAULT_PAYMENT_DATES):
+    """
+    Payments forecast for the next payment dates of each configuration of the company.
+
+    :param company: Company
+    :param payment_dates: Number of payment dates to forecast
+    """
+    frappe.has_permission("Purchase Invoice", "read", throw=True)
+
+    payment_dates = cint(payment_dates)
+    if not 0 < payment_dates <= MAX_PAYMENT_DATES:
+        frappe.throw(
+            _("Number of payment dates must be between 1 and {0}").format(
+                MAX_PAYMENT_DATES
+            )
+        )
+
+    settings = frappe.get_all(
+        CONFIGURATION_DOCTYPE, "*", {"disabled": 0, "company": company}
+    )
+
+    if not settings:
+        frappe.throw(_("Payments Processor Configuration not found for this company"))
+
+    return [
+        payment
+        for setting in settings
+        for payment in CashForecast(setting, payment_dates).get_forecast()
+    ]
+
+
+class CashForecast(PaymentsProcessor):
+    """
+    Payments of a configuration for each of its next payment dates.
+
+    Invoices, suppliers and balances are fetched once, for the due window of the
+    last payment date. Each payment term is then assigned to the first payment
+    date at which it is due (bisect on the horizon), so the forecast costs about
+    the same as a single run.
+
+    An invoice is listed on every payment date for which it has terms due, with
+    the amount due on that date. The paid amount of an invoice is adjusted
+    against its earliest payment date. Supplier outstanding is consumed across
+    payment dates in order. The cash budget is not applied, since it is set for
+    the next run only.
+    """
+
+    def __init__(self, setting, payment_dates=DEFAULT_PAYMENT_DATES):
+        super().__init__(setting)
+
+        self.payment_dates = []
+        date = self.today
+
+        while len(self.payment_dates) < payment_dates and (
+            date := self.calendar.get_next(date)
+        ):
+            self.payment_dates.append(date)
+
+        # terms due before these dates are due on the respective payment date
+        self.due_dates = [
+            add_days(date, -self.setting.due_date_offset) for date in self.payment_dates
+        ]
+
+        # due window of the last payment date covers all payment dates
+        if self.payment_dates:
+            self.next_payment_date = self.payment_dates[-1]
+            self.offset_due_date = self.due_dates[-1]
+
+    def get_forecast(self):
+        """
+        example response:
+
+        [
+            {
+                "configuration": "Configuration Name",
+                "payment_date": "2025-01-02",
+                "amount_to_pay": 1000,  # of invoices to be auto generated
+                "total_discount": 50,
+                "invoices": [{
+                    "name": "PI-00001",
+                    "supplier": "Supplier Name",
+                    "amount_to_pay": 1000,
+                    "auto_generate": 1,
+                    ...
+                }],
+            },
+            ...
+        ]
+        """
+        if not self.payment_dates:
+            return []
+
+        self.get_invoices()
+        self.get_suppliers()
+        self.update_supplier_outstanding()
+
+        return [
+            self.get_payments(payment_date, due_date, invoices)
+            for payment_date, due_date, invoices in zip(
+                self.payment_dates, self.due_dates, self.schedule, strict=True
+            )
+        ]
+
+    def get_payments(self, payment_date, due_date, invoices):
+        self.next_payment_date = payment_date
+        self.offset_due_date = due_date
+        self.invoices = invoices
+
+        self.processed_invoices = frappe._dict()
+        self.process_auto_generate()
+        self.process_auto_submit()
+
+        # outstanding used up on this payment date is not available on the next
+        for name in self.supplier_balances:
+            self.supplier_balances[name] = self.suppliers[name].remaining_balance
+
+        valid = [
+            invoice
+            for invoice_list in self.processed_invoices.get("valid", {}).values()
+            for invoice in invoice_list
+        ]
+
+        return frappe._dict(
+            {
+                "configuration": self.setting.name,
+                "payment_date": payment_date,
+                "amount_to_pay": sum(invoice.amount_to_pay for invoice in valid),
+                "total_discount": sum(invoice.total_discount for invoice in valid),
+                "invoices": [invoice.as_dict() for invoice in invoices.values()],
+            }
+        )
+
+    def get_invoices(self):
+        """
+        Get all invoices due within the horizon, by payment date.
+
+        eg:
+
+        self.schedule = [
+            {"PI-00001": {...}, ...},  # due on the first payment date
+            ...
+        ]
+        """
+        self.invoices = frappe._dict()
+        self.schedule = [frappe._dict() for _ in self.payment_dates]
+        # paid amount (negative) and total outstanding due of each invoice
+        self.paid_amounts = {}
+        self.outstanding_due = {}
+
+        for rows in self.get_invoice_rows():
+            for row in rows:
+                self.process_invoice_row(row)
+
+        self.adjust_paid_amounts()
+
+    def process_invoice_row(self, row):
+        last_index = len(self.payment_dates)
+        due_index = discount_index = last_index
+
+        if row.is_return:
+            due_index = 0  # immediately claim refund for returns
+
+        elif row.term_due_date:
+            due_index = bisect_right(self.due_dates, row.term_due_date)
+
+        if self.setting.claim_early_payment_discount and row.term_discount_date:
+            discount_index = bisect_right(self.payment_dates, row.term_discount_date)
+
+        if (index := min(due_index, discount_index)) == last_index:
+            return
+
+        payment_term = PaymentTerm.from_row(row)
+
+        if (updated := self.schedule[index].get(row.name)) is None:
+            updated = self.schedule[index][row.name] = Invoice.from_row(
+                row,
+                payment_date=self.payment_dates[index],
+                total_outstanding_due=0,
+                total_discount=0,
+                payment_terms=[],
+            )
+            self.invoices.setdefault(row.name, updated)
+
+        if (outstanding_due := self.outstanding_due.get(row.name)) is None:
+            invoice_total = row.rounded_total or row.grand_total
+            outstanding_due = row.outstanding_amount - invoice_total
+            self.paid_amounts[row.name] = outstanding_due
+
+        # update term outstanding based on paid amount, in the order of due date
+        term_outstanding = payment_term.outstanding_amount
+
+        if outstanding_due < 0:
+            payment_term.outstanding_amount = max(0, term_outstanding + outstanding_due)
+
+        self.outstanding_due[row.name] = outstanding_due + term_outstanding
+
+        if discount_index > index:
+            payment_term.discount_amount = 0
+        else:
+            self.apply_discount(payment_term)
+
+        updated.due_date = payment_term.due_date
+        updated.total_outstanding_due += term_outstanding
+        updated.total_discount += payment_term.discount_amount
+        updated.payment_terms.append(payment_term)
+
+    def adjust_paid_amounts(self):
+        """
+        Deduct the paid amount of invoices from their earliest payment dates.
+
+        Invoices with nothing left to pay on a payment date are removed from it.
+        """
+        paid_amounts = self.paid_amounts
+
+        for invoices in self.schedule:
+            paid = []
+
+            for invoice in invoices.values():
+                invoice.total_outstanding_due += paid_amounts.pop(invoice.name, 0)
+
+                if invoice.is_return or invoice.total_outstanding_due > 0:
+                    continue
+
+                # carried to the next payment date of the invoice
+                paid_amounts[invoice.name] = invoice.total_outstanding_due
+                paid.append(invoice.name)
+
+            for name in paid:
+                del invoices[name]
+
+    def get_cash_budget(self):
+        return None
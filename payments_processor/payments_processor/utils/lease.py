@@ -0,0 +1,142 @@
+import threading
+import uuid
+
+import frappe
+from redis.exceptions import WatchError
+
+# seconds
+LEASE_TTL = 120
+
+
+class LeaseLostError(Exception):
+    """
+    Raised when a run continues after its lease was taken over by another run.
+    """
+
+
+class RunLease:
+    """
+    Redis backed lease to ensure only one run of a configuration at a time.
+
+    While held, a heartbeat thread keeps renewing the lease. If the holder dies
+    (eg: worker killed), the lease is not renewed and expires after `ttl`
+    seconds, after which the stale lease can be taken over by another run.
+
+    A lease can be pickled for a worker process, where it is only checked, and
+    is renewed by the holder.
+
+    Usage:
+    ```py
+    lease = RunLease("Configuration Name")
+    if not lease.acquire():
+        return
+
+    try:
+        ...
+    finally:
+        lease.release()
+    ```
+    """
+
+    def __init__(
+        self, name: str, ttl: int = LEASE_TTL, heartbeat: bool = True, redis=None
+    ):
+        """
+        :param name: Name of the lease (eg: configuration name)
+        :param ttl: Seconds after which the lease expires if not renewed
+        :param heartbeat: Renew the lease in a background thread while held
+        :param redis: Redis client. Defaults to the site cache.
+        """
+        self._redis = redis
+        self.key = frappe.cache.make_key(f"payments_processor:lease:{name}")
+        self.ttl = ttl
+        self.heartbeat = heartbeat
+
+        self.token = uuid.uuid4().hex
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = None
+
+    def acquire(self) -> bool:
+        """
+        Acquire the lease. Returns `False` if it is held by another run.
+        """
+        if not self.redis.set(self.key, self.token, nx=True, px=self.ttl_ms):
+            return False
+
+        if self.heartbeat:
+            self._thread = threading.Thread(target=self._beat, daemon=True)
+            self._thread.start()
+
+        return True
+
+    def release(self):
+        """
+        Release the lease, if still held by this run.
+        """
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+        self._if_held(lambda pipe: pipe.delete(self.key))
+
+    def check(self):
+        """
+        Raise `LeaseLostError` if the lease is no longer held by this run.
+
+        Also checks Redis, since the heartbeat marks the lease lost only when
+        renewal fails (and does not run in worker processes).
+        """
+        if self.lost or self.redis.get(self.key) != self.token.encode():
+            self.lost = True
+            raise LeaseLostError(f"Lease {self.key} is no longer held by this run")
+
+    def renew(self) -> bool:
+        """
+        Extend the lease by `ttl` seconds. Returns `False` if the lease was lost.
+        """
+        return self._if_held(lambda pipe: pipe.pexpire(self.key, self.ttl_ms))
+
+    @property
+    def redis(self):
+        # the site cache of a worker process is set up after unpickling
+        return self._redis or frappe.cache
+
+    @property
+    def ttl_ms(self):
+        return int(self.ttl * 1000)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.update(_redis=None, _stop=None, _thread=None, heartbeat=False)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._stop = threading.Event()
+
+    def _beat(self):
+        while not self._stop.wait(self.ttl / 3):
+            if not self.renew():
+                self.lost = True
+                return
+
+    def _if_held(self, command) -> bool:
+        """
+        Run the command only if the lease is held by this run.
+        """
+        with self.redis.pipeline() as pipe:
+            try:
+                pipe.watch(self.key)
+
+                if pipe.get(self.key) != self.token.encode():
+                    return False
+
+                pipe.multi()
+                command(pipe)
+                pipe.execute()
+
+            except WatchError:
+                return False
+
+        return True
@@ -0,0 +1,174 @@
+import calendar
+from datetime import timedelta
+
+import frappe
+from frappe.utils import getdate
+
+DAY_NAMES = list(calendar.day_name)
+
+# days after the start date covered by the business day index
+HORIZON_DAYS = 400
+
+# days beyond the horizon scanned for payment days at its edges
+HORIZON_MARGIN = 31
+
+
+class PaymentCalendar:
+    """
+    Payment days of a configuration: `automate_on_*` weekdays, excluding
+    holidays of the configured Holiday List.
+
+    Weekdays are stored as a bitmask (Monday is bit 0), along with the offsets
+    from each weekday to the previous and next payment day.
+
+    If there are holidays, a business day index is built once for the planning
+    horizon: the previous and next payment date of every date in the horizon.
+    Any date is mapped to its previous or next payment date with a table lookup,
+    irrespective of the number of holidays. Holidays outside the horizon are
+    not considered.
+
+    Dates are expected to be `datetime.date` objects.
+    """
+
+    def __init__(self, setting, start=None, horizon_days=HORIZON_DAYS):
+        """
+        :param setting: Payments Processor Configuration
+        :param start: Start of the planning horizon. Defaults to today.
+        :param horizon_days: Days after the start covered by the planning horizon
+        """
+        self.weekdays = get_weekday_mask(setting)
+
+        # days to go back / forward from each weekday to reach a payment day
+        # (excluding the day itself). Zero if there are no payment days.
+        self.previous_offsets = [
+            next((i for i in range(1, 8) if self.has_weekday(weekday - i)), 0)
+            for weekday in range(7)
+        ]
+        self.next_offsets = [
+            next((i for i in range(1, 8) if self.has_weekday(weekday + i)), 0)
+            for weekday in range(7)
+        ]
+
+        # planning horizon, including a week before the start
+        self.start = getdate(start) - timedelta(days=7)
+        self.end = getdate(start) + timedelta(days=horizon_days)
+
+        self.holidays = get_holidays(
+            setting.get("holiday_list"),
+            self.start - timedelta(days=HORIZON_MARGIN),
+            self.end + timedelta(days=HORIZON_MARGIN),
+        )
+
+        self.previous_dates = self.next_dates = None
+        if self.holidays:
+            self.build_index()
+
+    def build_index(self):
+        """
+        Previous and next payment date of every date in the horizon.
+        """
+        margin = timedelta(days=HORIZON_MARGIN)
+        size = (self.end - self.start).days + 1
+
+        dates = [
+            self.start - margin + timedelta(days=i)
+            for i in range(size + 2 * HORIZON_MARGIN)
+        ]
+        is_payment_day = [
+            self.has_weekday(date.weekday()) and date not in self.holidays
+            for date in dates
+        ]
+
+        previous_dates = []
+        last = None
+        for date, is_payment in zip(dates, is_payment_day, strict=True):
+            previous_dates.append(last)
+            if is_payment:
+                last = date
+
+        next_dates = []
+        last = None
+        for date, is_payment in zip(
+            reversed(dates), reversed(is_payment_day), strict=True
+        ):
+            next_dates.append(last)
+            if is_payment:
+                last = date
+
+        next_dates.reverse()
+
+        self.previous_dates = previous_dates[HORIZON_MARGIN : HORIZON_MARGIN + size]
+        self.next_dates = next_dates[HORIZON_MARGIN : HORIZON_MARGIN + size]
+
+    @property
+    def days(self):
+        """
+        Names of payment weekdays, eg: `["Monday", "Thursday"]`
+        """
+        return [
+            day for weekday, day in enumerate(DAY_NAMES) if self.has_weekday(weekday)
+        ]
+
+    def has_weekday(self, weekday):
+        return bool(self.weekdays >> (weekday % 7) & 1)
+
+    def is_payment_day(self, date):
+        return self.has_weekday(date.weekday()) and date not in self.holidays
+
+    def get_index(self, date):
+        """
+        Position of the date in the business day index, if within the horizon.
+        """
+        if self.previous_dates is not None and self.start <= date <= self.end:
+            return (date - self.start).days
+
+    def get_previous(self, date):
+        """
+        Last payment date before the given date.
+        """
+        if (index := self.get_index(date)) is not None:
+            return self.previous_dates[index]
+
+        if offset := self.previous_offsets[date.weekday()]:
+            return date - timedelta(days=offset)
+
+    def get_next(self, date, inclusive=False):
+        """
+        First payment date after the given date.
+
+        :param inclusive: Return the date itself if it is a payment day
+        """
+        if inclusive and self.is_payment_day(date):
+            return date
+
+        if (index := self.get_index(date)) is not None:
+            return self.next_dates[index]
+
+        if offset := self.next_offsets[date.weekday()]:
+            return date + timedelta(days=offset)
+
+
+def get_weekday_mask(setting):
+    return sum(
+        1 << weekday
+        for weekday, day in enumerate(DAY_NAMES)
+        if setting.get(f"automate_on_{day.lower()}")
+    )
+
+
+def get_holidays(holiday_list, from_date, to_date):
+    if not holiday_list:
+        return frozenset()
+
+    return frozenset(
+        getdate(date)
+        for date in frappe.get_all(
+            "Holiday",
+            filters={
+                "parent": holiday_list,
+                "parenttype": "Holiday List",
+                "holiday_date": ("between", (from_date, to_date)),
+            },
+            pluck="holiday_date",
+        )
+    )
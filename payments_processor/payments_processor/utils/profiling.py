@@ -0,0 +1,90 @@
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import frappe
+from frappe.utils import now_datetime
+
+
+class StageProfiler:
+    """
+    Records wall time and DB query count for each stage of a run.
+
+    Peak memory is recorded only if `trace_memory` is set, since tracing
+    allocations slows down the run considerably.
+
+    Queries are counted by wrapping `frappe.db.sql` while profiling. Queries made
+    on other connections (eg: parallel payment entry workers) are not counted.
+
+    Usage:
+    ```py
+    profiler = StageProfiler()
+    with profiler:
+        with profiler.stage("get_invoices"):
+            ...
+
+    profiler.stages
+    ```
+    """
+
+    def __init__(self, trace_memory: bool = False):
+        self.trace_memory = trace_memory
+        self.query_count = 0
+        self.stages = []
+
+        self._db = None
+        self._sql = None
+        self._started_tracing = False
+
+    def __enter__(self):
+        self._db = frappe.db
+        self._sql = vars(self._db).get("sql")
+        sql = self._db.sql
+
+        def counted_sql(*args, **kwargs):
+            self.query_count += 1
+            return sql(*args, **kwargs)
+
+        self._db.sql = counted_sql
+
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+        return self
+
+    def __exit__(self, *exc):
+        if self._sql:
+            self._db.sql = self._sql
+        else:
+            del self._db.sql
+
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Profile the enclosed block as a stage. Stages should not be nested.
+        """
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+
+        stage = frappe._dict(
+            {"stage": name, "start": now_datetime(), "queries": self.query_count}
+        )
+        start = time.perf_counter()
+
+        try:
+            yield stage
+
+        finally:
+            stage.duration = time.perf_counter() - start
+            stage.end = now_datetime()
+            stage.queries = self.query_count - stage.queries
+
+            if self.trace_memory:
+                stage.peak_memory = tracemalloc.get_traced_memory()[1]
+
+            self.stages.append(stage)
@@ -0,0 +1,85 @@
+import re
+
+import frappe
+
+from payments_processor.constants import CONFIGURATION_DOCTYPE
+from payments_processor.payments_processor.utils.automation import PaymentsProcessor
+
+# suppliers used as parameters of supplier queries
+SAMPLE_SUPPLIERS = 20
+
+PG_FULL_SCAN = re.compile(r"Seq Scan on (\S+)")
+
+
+def check_query_plans(company=None):
+    """
+    Explain the queries of each enabled configuration and find tables that are
+    read with a full scan (eg: when indexes are missing).
+
+    Returns full scans by configuration and query:
+
+    {
+        "Configuration Name": {
+            "Payment Terms": ["tabPurchase Invoice"],
+            ...
+        },
+        ...
+    }
+    """
+    filters = {"disabled": 0}
+    if company:
+        filters["company"] = company
+
+    suppliers = frappe.get_all("Supplier", pluck="name", limit=SAMPLE_SUPPLIERS)
+
+    return {
+        setting.name: {
+            name: full_scans
+            for name, query in get_processor_queries(
+                PaymentsProcessor(setting), suppliers
+            ).items()
+            if (full_scans := get_full_scans(query))
+        }
+        for setting in frappe.get_all(CONFIGURATION_DOCTYPE, "*", filters)
+    }
+
+
+def get_processor_queries(processor, suppliers):
+    """
+    SQL of the queries run by the processor for each configuration run, by name.
+    """
+    invoices_query, _ = processor.get_invoices_query()
+    queries = {"Payment Terms": invoices_query.get_sql()}
+
+    if not processor.setting.use_candidate_index:
+        queries["Invoices"] = processor.get_invoice_fields_query().get_sql()
+
+    queries.update(
+        {
+            "Draft Payment Amounts": processor.get_draft_payment_amounts(
+                suppliers, run=False
+            ),
+            "Bank Accounts": processor.get_party_bank_accounts(suppliers, run=False),
+            "Contacts": processor.get_party_contacts(suppliers, run=False),
+        }
+    )
+
+    return queries
+
+
+def get_full_scans(query):
+    """
+    Tables read with a full scan in the query plan.
+    """
+    if frappe.db.db_type == "postgres":
+        plan = frappe.db.sql(f"EXPLAIN {query}", as_list=True)
+        return [
+            match.group(1) for (line,) in plan if (match := PG_FULL_SCAN.search(line))
+        ]
+
+    return [
+        row.table
+        for row in frappe.db.sql(f"EXPLAIN {query}", as_dict=True)
+        # derived tables (eg: `<derived2>`) are always scanned
+        if row.type == "ALL" and not row.table.startswith("<")
+    ]
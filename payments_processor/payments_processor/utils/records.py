@@ -0,0 +1,223 @@
+import frappe
+
+
+class Record:
+    """
+    Compact record with attribute and mapping-like access, like `frappe._dict`.
+
+    Known fields are stored in `__slots__` and are `None` until set. Other keys
+    (eg: returned by hooks) are set with item access or `update()`, and are
+    stored in `_extra`, which is only allocated when first used.
+
+    As with `frappe._dict`, missing keys read as `None`. Fields that are `None`
+    are not part of `keys()` / `as_dict()`.
+    """
+
+    __slots__ = ("_extra",)
+
+    # fields of the record and its bases, in order (see `__init_subclass__`)
+    FIELDS = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.FIELDS = (*cls.FIELDS, *cls.__dict__.get("__slots__", ()))
+
+    def __init__(self, values=None, /, **kwargs):
+        # so that reading a field never falls back to `__getattr__`
+        for key in self.FIELDS:
+            setattr(self, key, None)
+
+        self._extra = None
+
+        if values:
+            self.update(values)
+
+        if kwargs:
+            self.update(kwargs)
+
+    def __getattr__(self, key):
+        # only called for keys that are not fields
+        if key.startswith("_"):
+            raise AttributeError(key)
+
+        if self._extra:
+            return self._extra.get(key)
+
+    def __contains__(self, key):
+        if key in self.FIELDS:
+            return getattr(self, key) is not None
+
+        return bool(self._extra) and key in self._extra
+
+    def __getitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+
+        return self.get(key)
+
+    def __setitem__(self, key, value):
+        if key in self.FIELDS:
+            setattr(self, key, value)
+
+        elif self._extra is None:
+            self._extra = {key: value}
+
+        else:
+            self._extra[key] = value
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def __eq__(self, other):
+        if not isinstance(other, Record):
+            return NotImplemented
+
+        return type(self) is type(other) and dict(self.items()) == dict(other.items())
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict(self.items())!r})"
+
+    def __reduce__(self):
+        return type(self), (dict(self.items()),)
+
+    def get(self, key, default=None):
+        if key in self.FIELDS:
+            value = getattr(self, key)
+
+        elif self._extra:
+            value = self._extra.get(key)
+
+        else:
+            value = None
+
+        return default if value is None else value
+
+    def setdefault(self, key, default=None):
+        if key in self:
+            return self[key]
+
+        self[key] = default
+        return default
+
+    def update(self, values=None, /, **kwargs):
+        for fields in (values, kwargs):
+            if fields:
+                for key, value in fields.items():
+                    self[key] = value
+
+    def keys(self):
+        return [key for key, _ in self.items()]
+
+    def values(self):
+        return [value for _, value in self.items()]
+
+    def items(self):
+        for key in self.FIELDS:
+            if (value := getattr(self, key)) is not None:
+                yield key, value
+
+        if self._extra:
+            yield from self._extra.items()
+
+    def as_dict(self):
+        """
+        Convert to `frappe._dict`, including records in list fields.
+        """
+        return frappe._dict(
+            (
+                key,
+                [row.as_dict() if isinstance(row, Record) else row for row in value]
+                if isinstance(value, list)
+                else value,
+            )
+            for key, value in self.items()
+        )
+
+
+class PaymentTerm(Record):
+    __slots__ = (
+        "discount",
+        "discount_amount",
+        "discount_date",
+        "discount_type",
+        "due_date",
+        "name",
+        "outstanding_amount",
+    )
+
+    @classmethod
+    def from_row(cls, row, **kwargs):
+        """
+        Payment term from a due invoice row (`term_*` fields).
+        """
+        term = cls(**kwargs) if kwargs else cls()
+        term.name = row.term_name
+        term.due_date = row.term_due_date
+        term.discount_date = row.term_discount_date
+        term.discount_type = row.term_discount_type
+        term.discount = row.term_discount
+
+        if "outstanding_amount" not in kwargs:
+            term.outstanding_amount = row.term_outstanding_amount
+
+        return term
+
+
+class Invoice(Record):
+    # fields from the due invoice row
+    ROW_FIELDS = (
+        "name",
+        "company",
+        "supplier",
+        "outstanding_amount",
+        "grand_total",
+        "rounded_total",
+        "currency",
+        "contact_person",
+        "bill_no",
+        "is_return",
+        "on_hold",
+        "hold_comment",
+        "release_date",
+        "payment_date",
+    )
+
+    __slots__ = (
+        *ROW_FIELDS,
+        # payment terms
+        "due_date",
+        "total_outstanding_due",
+        "total_discount",
+        "payment_terms",
+        # processing
+        "amount_to_pay",
+        "auto_generate",
+        "auto_submit",
+        "reason",
+        "reason_code",
+        # payment entry
+        "payment_entry",
+        "paid_amount",
+        "pe_status",
+        "paid_from_account_currency",
+    )
+
+    @classmethod
+    def from_row(cls, row, **kwargs):
+        """
+        Invoice from a due invoice row. Payment term fields of the row are ignored.
+        Fields passed as keyword arguments take precedence over the row.
+        """
+        invoice = cls()
+
+        for field in cls.ROW_FIELDS:
+            if field in row:
+                setattr(invoice, field, row[field])
+
+        if kwargs:
+            invoice.update(kwargs)
+
+        return invoice
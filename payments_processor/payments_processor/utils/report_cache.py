@@ -0,0 +1,80 @@
+import frappe
+from frappe.query_builder.functions import Max
+from frappe.utils import getdate
+
+from payments_processor.constants import CONFIGURATION_DOCTYPE
+
+CACHE_KEY = "payments_processor:report"
+VERSION_KEY = "payments_processor:report_version"
+
+# seconds
+CACHE_TTL = 6 * 60 * 60
+
+# changes to these doctypes can change the processed invoices
+WATERMARK_DOCTYPES = (
+    "Purchase Invoice",
+    "Payment Entry",
+    "Journal Entry",
+    "Supplier",
+    CONFIGURATION_DOCTYPE,
+)
+
+
+def get_cached_result(company, payment_date, compute):
+    """
+    Get processed invoices from cache, or compute and cache them.
+
+    Results are cached for the company and payment date, and are invalidated by
+    document events (see `invalidate_cache`) and by changes to the data watermark
+    (latest modified of relevant doctypes).
+
+    :param company: Company
+    :param payment_date: Payment date of the report
+    :param compute: Function returning the result to cache
+    """
+    key = ":".join(
+        (
+            CACHE_KEY,
+            get_cache_version(),
+            get_data_watermark(),
+            str(getdate()),  # payment dates depend on today
+            company,
+            str(getdate(payment_date)),
+        )
+    )
+
+    result = frappe.cache.get_value(key)
+    if result is None:
+        result = compute()
+        frappe.cache.set_value(key, result, expires_in_sec=CACHE_TTL)
+
+    return result
+
+
+def get_cache_version():
+    if not (version := frappe.cache.get_value(VERSION_KEY)):
+        version = invalidate_cache()
+
+    return version
+
+
+def invalidate_cache(doc=None, method=None):
+    """
+    Invalidate all cached results. Also used as a document event.
+    """
+    version = frappe.generate_hash(length=10)
+    frappe.cache.set_value(VERSION_KEY, version)
+
+    return version
+
+
+def get_data_watermark():
+    """
+    Latest modified timestamp of each relevant doctype, in a single query.
+    """
+    tables = [frappe.qb.DocType(doctype) for doctype in WATERMARK_DOCTYPES]
+    watermark = frappe.qb.select(
+        *(frappe.qb.from_(table).select(Max(table.modified)) for table in tables)
+    ).run()[0]
+
+    return "|".join(str(modified) for modified in watermark)
@@ -0,0 +1,123 @@
+import pickle
+
+import frappe
+
+# bank accounts and contacts are shared by configurations processed in the same
+# scheduler tick
+PARTY_DETAILS_TTL = 60
+
+
+class PartyCache:
+    """
+    Redis backed cache of values by supplier name, with bulk get and set.
+
+    Usage:
+    ```py
+    cache = PartyDetailsCache()
+    values = cache.get_many(names)
+
+    if missing := set(names) - values.keys():
+        cache.set_many(fetch_values(missing))
+    ```
+    """
+
+    namespace = None
+    default_ttl = None
+
+    def __init__(self, ttl: int | None = None, redis=None):
+        """
+        :param ttl: Seconds after which entries expire
+        :param redis: Redis client. Defaults to the site cache.
+        """
+        self.redis = redis or frappe.cache
+        self.ttl = ttl or self.default_ttl
+
+    def get_many(self, names) -> dict:
+        """
+        Cached values of the given suppliers, in a single round trip.
+        Suppliers that are not cached are skipped.
+        """
+        if not (names := list(names)):
+            return {}
+
+        values = self.redis.mget([self.get_key(name) for name in names])
+
+        return {
+            name: pickle.loads(value)
+            for name, value in zip(names, values, strict=True)
+            if value is not None
+        }
+
+    def set_many(self, values: dict):
+        """
+        Cache values by supplier name, in a single round trip.
+        """
+        with self.redis.pipeline(transaction=False) as pipe:
+            for name, value in values.items():
+                pipe.set(
+                    self.get_key(name), pickle.dumps(value), ex=self.get_expiry(value)
+                )
+
+            pipe.execute()
+
+    def delete(self, names):
+        if names := [self.get_key(name) for name in names]:
+            self.redis.delete(*names)
+
+    def delete_after_commit(self, names):
+        """
+        Delete after commit, as a run could otherwise cache the old values before
+        the change is committed.
+        """
+        frappe.db.after_commit.add(lambda: self.delete(names))
+
+    def get_key(self, name):
+        return frappe.cache.make_key(f"payments_processor:{self.namespace}:{name}")
+
+    def get_expiry(self, value) -> int:
+        return self.ttl
+
+
+class PartyDetailsCache(PartyCache):
+    """
+    Default bank account and primary contact of suppliers, as
+    `(bank_account, contact)` by supplier name. Either can be `None`.
+
+    Entries are invalidated by document events of Bank Account and Contact (see
+    `invalidate_bank_account` and `invalidate_contact`).
+    """
+
+    namespace = "party_details"
+    default_ttl = PARTY_DETAILS_TTL
+
+
+def invalidate_bank_account(doc, method=None):
+    """
+    Remove details of the supplier of the bank account (before and after the
+    change) from the cache. Used as a document event of Bank Account.
+    """
+    suppliers = {
+        row.party
+        for row in (doc, doc.get_doc_before_save())
+        if row and row.party_type == "Supplier" and row.party
+    }
+
+    if suppliers:
+        PartyDetailsCache().delete_after_commit(list(suppliers))
+
+
+def invalidate_contact(doc, method=None):
+    """
+    Remove details of suppliers linked to the contact (before and after the
+    change) from the cache. Used as a document event of Contact.
+    """
+    suppliers = {
+        link.link_name
+        for row in (doc, doc.get_doc_before_save())
+        if row
+        for link in row.links
+        if link.link_doctype == "Supplier"
+    }
+
+    if suppliers:
+        PartyDetailsCache().delete_after_commit(list(suppliers))
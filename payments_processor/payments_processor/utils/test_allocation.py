@@ -0,0 +1,183 @@
+# Copyright (c) 2026, Resilient Tech and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_days, getdate
+
+from payments_processor.payments_processor.benchmarks.columnar import get_processor
+from payments_processor.payments_processor.utils.allocation import (
+    allocate_cash_budget,
+)
+from payments_processor.payments_processor.utils.records import Invoice, PaymentTerm
+
+TODAY = getdate()
+
+
+class TestCashBudgetAllocation(FrappeTestCase):
+    def test_past_due_invoices_are_paid_first(self):
+        invoices = [
+            make_invoice("PI-1", 100, discount=10, due_in=30),
+            make_invoice("PI-2", 100, due_in=-10),
+            make_invoice("PI-3", 100, due_in=-20),
+        ]
+
+        skipped = allocate_cash_budget(invoices, 200, TODAY)
+        self.assertEqual(names(skipped), ["PI-1"])
+
+        # oldest due date first
+        skipped = allocate_cash_budget(invoices, 150, TODAY)
+        self.assertEqual(names(skipped), ["PI-1", "PI-2"])
+
+    def test_discount_is_maximized(self):
+        invoices = [
+            make_invoice("PI-1", 100, discount=1, due_in=10),
+            make_invoice("PI-2", 100, discount=5, due_in=10),
+            make_invoice("PI-3", 50, discount=2, due_in=10),
+        ]
+
+        skipped = allocate_cash_budget(invoices, 160, TODAY)
+        self.assertEqual(names(skipped), ["PI-1"])
+
+        # larger invoice is skipped, smaller one still fits
+        skipped = allocate_cash_budget(invoices, 60, TODAY)
+        self.assertEqual(names(skipped), ["PI-1", "PI-2"])
+
+    def test_returns_do_not_use_budget(self):
+        invoices = [
+            make_invoice("PI-1", -100, due_in=0),
+            make_invoice("PI-2", 100, due_in=-1),
+        ]
+
+        self.assertEqual(allocate_cash_budget(invoices, 100, TODAY), [])
+
+
+class TestCashBudgetProcessing(FrappeTestCase):
+    def test_rejected_invoices_do_not_use_outstanding(self):
+        processor = get_processor(
+            "_Test Company",
+            auto_generate_entries=1,
+            limit_payment_to_outstanding=1,
+            cash_budget_source="Manual",
+            cash_budget=100,
+        )
+
+        # outstanding of the supplier is used up by the first invoice, which is
+        # over the budget
+        process_auto_generate(
+            processor,
+            [
+                make_due_invoice("PI-1", "Supplier A", 250),
+                make_due_invoice("PI-2", "Supplier A", 80),
+            ],
+            {"Supplier A": 250},
+        )
+
+        self.assertEqual(processor.invoices["PI-1"].reason_code, "1007")
+        self.assertEqual(
+            names(processor.processed_invoices.valid["Supplier A"]), ["PI-2"]
+        )
+        self.assertEqual(processor.invoices["PI-2"].amount_to_pay, 80)
+
+    def test_hooks_run_once(self):
+        processor = get_processor(
+            "_Test Company",
+            auto_generate_entries=1,
+            limit_payment_to_outstanding=1,
+            cash_budget_source="Manual",
+            cash_budget=1000,
+        )
+
+        calls = []
+
+        def reject_first_invoice(invoices, suppliers):
+            calls.append(names(invoices))
+            return {"PI-1": {"reason": "Rejected", "reason_code": "9999"}}
+
+        processor.filter_hooks = {
+            "filter_auto_generate_payments": [reject_first_invoice]
+        }
+
+        # outstanding of the rejected invoice is left for later invoices
+        process_auto_generate(
+            processor,
+            [
+                make_due_invoice("PI-1", "Supplier A", 400),
+                make_due_invoice("PI-2", "Supplier A", 300),
+                make_due_invoice("PI-3", "Supplier A", 300),
+            ],
+            {"Supplier A": 500},
+        )
+
+        self.assertEqual(calls, [["PI-1", "PI-2", "PI-3"]])
+        self.assertEqual(processor.invoices["PI-1"].reason_code, "9999")
+        self.assertEqual(processor.invoices["PI-2"].amount_to_pay, 300)
+        self.assertEqual(processor.invoices["PI-3"].amount_to_pay, 200)
+        self.assertEqual(processor.suppliers["Supplier A"].remaining_balance, 0)
+
+    def test_grouped_threshold_before_budget(self):
+        processor = get_processor(
+            "_Test Company",
+            auto_generate_entries=1,
+            group_payments_by_supplier=1,
+            auto_generate_threshold=100,
+            cash_budget_source="Manual",
+            cash_budget=150,
+        )
+
+        process_auto_generate(
+            processor,
+            [
+                make_due_invoice("PI-1", "Supplier A", 60, due_in=-10),
+                make_due_invoice("PI-2", "Supplier A", 60, due_in=-9),
+                make_due_invoice("PI-3", "Supplier B", 90, due_in=-5),
+            ],
+        )
+
+        self.assertEqual(
+            {
+                invoice.name: invoice.reason_code
+                for invoices in processor.processed_invoices.invalid.values()
+                for invoice in invoices
+            },
+            {"PI-1": "1006", "PI-2": "1006"},
+        )
+        self.assertEqual(
+            names(processor.processed_invoices.valid["Supplier B"]), ["PI-3"]
+        )
+
+
+def process_auto_generate(processor, invoices, balances=None):
+    processor.invoices = frappe._dict((invoice.name, invoice) for invoice in invoices)
+    processor.suppliers = {
+        invoice.supplier: frappe._dict(name=invoice.supplier) for invoice in invoices
+    }
+    processor.supplier_balances = balances or {}
+    processor.draft_payment_invoices = set()
+
+    processor.process_auto_generate()
+
+
+def make_due_invoice(name, supplier, outstanding, due_in=-5):
+    return Invoice(
+        name=name,
+        supplier=supplier,
+        currency="INR",
+        is_return=0,
+        total_outstanding_due=outstanding,
+        total_discount=0,
+        payment_terms=[PaymentTerm(due_date=add_days(TODAY, due_in))],
+    )
+
+
+def make_invoice(name, amount_to_pay, discount=0, due_in=0):
+    return Invoice(
+        name=name,
+        amount_to_pay=amount_to_pay,
+        total_discount=discount,
+        payment_terms=[PaymentTerm(due_date=add_days(TODAY, due_in))],
+    )
+
+
+def names(invoices):
+    return [invoice.name for invoice in invoices]
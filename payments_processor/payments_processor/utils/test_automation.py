@@ -0,0 +1,596 @@
+# Copyright (c) 2026, Resilient Tech and Contributors
+# See license.txt
+
+import pickle
+import random
+from concurrent.futures import Future
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_days, get_datetime, getdate
+
+from payments_processor.constants import CONFIGURATION_DOCTYPE
+from payments_processor.patches.v15 import set_next_execution
+from payments_processor.payments_processor.benchmarks.columnar import get_processor
+from payments_processor.payments_processor.benchmarks.ledger import (
+    delete_ledger,
+    make_ledger,
+)
+from payments_processor.payments_processor.utils.automation import (
+    SUPPLIER_FIELDS,
+    PaymentsProcessor,
+    autocreate_payment_entry,
+    get_next_execution,
+    get_weekday,
+)
+from payments_processor.payments_processor.utils.lease import (
+    LeaseLostError,
+    RunLease,
+)
+from payments_processor.payments_processor.utils.payment_calendar import DAY_NAMES
+from payments_processor.payments_processor.utils.records import Invoice
+from payments_processor.payments_processor.utils.supplier_cache import (
+    PartyDetailsCache,
+)
+from payments_processor.payments_processor.utils.test_payment_calendar import (
+    MONDAY,
+    make_holiday_list,
+)
+
+COMPANY = "_Test Company"
+AUTOMATION = "payments_processor.payments_processor.utils.automation"
+
+
+class TestProcessorStages(FrappeTestCase):
+    def test_due_dates_computed_in_query(self):
+        make_ledger(300, COMPANY)
+        self.addCleanup(delete_ledger)
+
+        for seed in range(20):
+            setting, filters = get_random_setting(seed)
+
+            with self.subTest(seed=seed, setting=setting, filters=filters):
+                expected = PaymentsProcessor(setting, frappe._dict(filters))
+                expected.get_invoices()
+
+                processor = PaymentsProcessor(
+                    frappe._dict(setting, compute_due_in_query=1), frappe._dict(filters)
+                )
+                processor.get_invoices()
+
+                self.assertEqual(processor.invoices, expected.invoices)
+
+                # only due rows are fetched
+                self.assertEqual(
+                    sum(len(rows) for rows in processor.get_invoice_rows()),
+                    sum(
+                        len(invoice.payment_terms)
+                        for invoice in processor.invoices.values()
+                    ),
+                )
+
+    def test_weekday_in_query(self):
+        due_date = frappe.qb.DocType("Payment Schedule").due_date
+
+        for db_type, sql in (
+            ("mariadb", "WEEKDAY("),
+            ("postgres", "EXTRACT(ISODOW FROM "),
+        ):
+            with (
+                self.subTest(db_type=db_type),
+                patch.object(frappe.db, "db_type", db_type),
+            ):
+                self.assertIn(sql, get_weekday(due_date).get_sql())
+
+    def test_invoice_batches(self):
+        make_ledger(300, COMPANY)
+        self.addCleanup(delete_ledger)
+
+        setting = frappe._dict(company=COMPANY, automate_on_monday=1, due_date_offset=2)
+        filters = frappe._dict(payment_date=add_days(getdate(), 30))
+
+        expected = PaymentsProcessor(setting, filters)
+        (expected_rows,) = expected.get_invoice_rows()
+        expected.process_invoices()
+
+        due_dates = [row.term_due_date for row in expected_rows]
+        self.assertLess(len(set(due_dates)), len(due_dates), "no ties on due date")
+
+        # with a batch size of 1, terms with the same due date are in separate batches
+        for batch_size in (1, 7):
+            with self.subTest(batch_size=batch_size):
+                processor = PaymentsProcessor(
+                    frappe._dict(setting, invoice_batch_size=batch_size), filters
+                )
+                batches = list(processor.get_invoice_rows())
+
+                self.assertGreater(len(batches), 1)
+                self.assertEqual(
+                    [row for rows in batches for row in rows], expected_rows
+                )
+
+                processor.process_invoices()
+                self.assertEqual(processor.invoices, expected.invoices)
+                self.assertEqual(
+                    processor.processed_invoices, expected.processed_invoices
+                )
+
+    def test_supplier_checks_joined_to_invoice_query(self):
+        make_ledger(200, COMPANY)
+        self.addCleanup(delete_ledger)
+
+        processor = get_processor(COMPANY)
+        processor.get_invoices()
+
+        # suppliers of fetched rows are not queried again
+        with patch("frappe.get_all") as get_all:
+            processor.get_suppliers()
+
+        get_all.assert_not_called()
+
+        names = {invoice.supplier for invoice in processor.invoices.values()}
+        suppliers = frappe.get_all(
+            "Supplier",
+            filters={"name": ("in", list(names))},
+            fields=("name", *SUPPLIER_FIELDS),
+        )
+
+        self.assertEqual(
+            {name: processor.suppliers[name] for name in names},
+            {supplier.name: supplier for supplier in suppliers},
+        )
+
+        draft_payment_invoices = frappe.get_all(
+            "Payment Entry",
+            filters={
+                "docstatus": 0,
+                "company": COMPANY,
+                "payment_type": "Pay",
+                "party_type": "Supplier",
+                "reference_doctype": "Purchase Invoice",
+            },
+            fields=["`tabPayment Entry Reference`.reference_name"],
+            as_list=True,
+        )
+
+        self.assertEqual(
+            processor.draft_payment_invoices & set(processor.invoices),
+            {row[0] for row in draft_payment_invoices} & set(processor.invoices),
+        )
+
+
+class TestScheduling(FrappeTestCase):
+    def test_configurations_enqueued_once(self):
+        configurations = [
+            frappe._dict(name="_Test Configuration", queue=None),
+            frappe._dict(name="_Test Configuration 1", queue="short"),
+        ]
+
+        with (
+            patch("frappe.get_all", return_value=configurations),
+            patch("frappe.enqueue") as enqueue,
+        ):
+            autocreate_payment_entry()
+            autocreate_payment_entry()
+
+        jobs = [
+            (call.kwargs["configuration"], call.kwargs["queue"], call.kwargs["job_id"])
+            for call in enqueue.call_args_list
+        ]
+
+        # same job id on each tick, so that queued or running jobs are not repeated
+        self.assertEqual(
+            jobs,
+            [
+                (
+                    "_Test Configuration",
+                    "long",
+                    "payments_processor::_Test Configuration",
+                ),
+                (
+                    "_Test Configuration 1",
+                    "short",
+                    "payments_processor::_Test Configuration 1",
+                ),
+            ]
+            * 2,
+        )
+        self.assertTrue(
+            all(call.kwargs["deduplicate"] for call in enqueue.call_args_list)
+        )
+
+    def test_next_execution_skips_holidays(self):
+        # Thursday is a holiday
+        setting = frappe._dict(
+            automate_on_monday=1,
+            automate_on_thursday=1,
+            processing_time="10:30:00",
+            holiday_list=make_holiday_list(["2026-10-22"]),
+        )
+
+        def next_execution(after, last_execution=None):
+            return get_next_execution(
+                frappe._dict(setting, last_execution=last_execution), after
+            )
+
+        self.assertEqual(next_execution(MONDAY), get_datetime("2026-10-19 10:30:00"))
+
+        # processed on Monday
+        self.assertEqual(
+            next_execution(MONDAY, "2026-10-19 10:31:00"),
+            get_datetime("2026-10-26 10:30:00"),
+        )
+        self.assertEqual(
+            next_execution(add_days(MONDAY, 1), "2026-10-19 10:31:00"),
+            get_datetime("2026-10-26 10:30:00"),
+        )
+
+        # after the holiday
+        self.assertEqual(
+            next_execution(add_days(MONDAY, 7), "2026-10-19 10:31:00"),
+            get_datetime("2026-10-26 10:30:00"),
+        )
+        self.assertEqual(
+            next_execution(add_days(MONDAY, 8), "2026-10-26 10:31:00"),
+            get_datetime("2026-10-29 10:30:00"),
+        )
+
+        self.assertIsNone(
+            get_next_execution(frappe._dict(setting, processing_time=None))
+        )
+
+    def test_next_execution_set_by_patch(self):
+        setting = frappe._dict(
+            name="_Test Configuration",
+            automate_on_monday=1,
+            processing_time="10:30:00",
+        )
+
+        with (
+            patch("frappe.get_all", return_value=[setting]),
+            patch.object(frappe.db, "set_value") as set_value,
+        ):
+            set_next_execution.execute()
+
+        set_value.assert_called_once_with(
+            CONFIGURATION_DOCTYPE,
+            "_Test Configuration",
+            "next_execution",
+            get_next_execution(setting),
+            update_modified=False,
+        )
+
+
+class TestPartyDetails(FrappeTestCase):
+    def test_prefetched_once_for_configurations(self):
+        supplier = "_Test Supplier Without Details"
+        cache = PartyDetailsCache()
+        cache.delete([supplier])
+        self.addCleanup(cache.delete, [supplier])
+        fetched = []
+
+        for _ in range(2):
+            processor = get_processor(COMPANY)
+            processor.processed_invoices = frappe._dict(valid={supplier: []})
+
+            def fetch_bank_accounts(
+                suppliers, run=True, fetch=processor.get_party_bank_accounts
+            ):
+                fetched.append(suppliers)
+                return fetch(suppliers, run=run)
+
+            processor.get_party_bank_accounts = fetch_bank_accounts
+
+            # empty results are cached as well
+            self.assertIsNone(processor.get_party_bank_account(supplier))
+            self.assertIsNone(processor.get_contact_person(supplier))
+
+        self.assertEqual(fetched, [[supplier]])
+
+
+class TestRunLease(FrappeTestCase):
+    def test_lost_lease_stops_payments(self):
+        lease = RunLease("_Test Payments Lease", heartbeat=False)
+        self.assertTrue(lease.acquire())
+        self.addCleanup(lease.release)
+
+        processor = get_processor(COMPANY)
+        processor.lease = lease
+        processor.processed_invoices = frappe._dict(
+            valid={"_Test Supplier 1": [], "_Test Supplier 2": []}
+        )
+        created = []
+
+        def create_payments_for_supplier(supplier_name, invoices):
+            created.append(supplier_name)
+
+            # lease expired and was taken over by another run
+            frappe.cache.delete(lease.key)
+            return True
+
+        processor.create_payments_for_supplier = create_payments_for_supplier
+
+        with self.assertRaises(LeaseLostError):
+            processor.create_payments()
+
+        self.assertEqual(created, ["_Test Supplier 1"])
+
+
+class TestParallelPayments(FrappeTestCase):
+    def test_create_payments_with_workers(self):
+        lease = RunLease("_Test Payments Lease", heartbeat=False)
+        self.assertTrue(lease.acquire())
+        self.addCleanup(lease.release)
+
+        processor = get_processor(COMPANY, payment_entry_workers=2)
+        processor.lease = lease
+        processor.processed_invoices = frappe._dict(
+            valid={
+                f"_Test Supplier {idx}": [
+                    Invoice(name=f"_Test PI {idx}", supplier=f"_Test Supplier {idx}")
+                ]
+                for idx in range(5)
+            }
+        )
+
+        with (
+            patch(f"{AUTOMATION}.ProcessPoolExecutor", InProcessExecutor),
+            patch.object(
+                PaymentsProcessor,
+                "create_payments_for_supplier",
+                create_payments_for_supplier,
+            ),
+            patch("frappe.init") as init,
+            patch("frappe.connect"),
+            patch("frappe.destroy") as destroy,
+        ):
+            processor.create_payments()
+
+        # a site connection for each shard, destroyed when done
+        self.assertEqual(InProcessExecutor.start_method, "spawn")
+        self.assertEqual(init.call_count, 2)
+        self.assertEqual(destroy.call_count, 2)
+
+        self.assertEqual(
+            [
+                invoice.reason_code
+                for invoice in processor.processed_invoices.invalid["_Test Supplier 2"]
+            ],
+            ["3001"],
+        )
+
+        self.assertNotIn("_Test Supplier 2", processor.processed_invoices.valid)
+
+        for invoices in processor.processed_invoices.valid.values():
+            for invoice in invoices:
+                self.assertEqual(invoice.payment_entry, f"_Test PE {invoice.name}")
+                self.assertEqual(invoice.pe_status, "Draft")
+
+
+class TestSupplierPayments(FrappeTestCase):
+    def test_failed_group_rolls_back_supplier(self):
+        processor = get_processor(COMPANY)
+        invoices = [
+            Invoice(name=f"_Test PI {idx}", supplier="_Test") for idx in range(3)
+        ]
+        processor.processed_invoices = frappe._dict(valid={"_Test": invoices})
+        processor.party_bank_accounts = processor.party_contacts = {}
+
+        # second group of the supplier fails
+        processor.create_payment_entry = lambda supplier_name, invoice_list: (
+            PaymentEntry(fail=invoice_list[0].name == "_Test PI 1")
+        )
+
+        processor.create_payments()
+
+        self.assertNotIn("_Test", processor.processed_invoices.valid)
+
+        for invoice in processor.processed_invoices.invalid["_Test"]:
+            self.assertEqual(invoice.reason_code, "3001")
+            self.assertIsNone(invoice.payment_entry)
+            self.assertIsNone(invoice.pe_status)
+
+    def test_commit_batches(self):
+        processor = get_processor(COMPANY)
+        processor.processed_invoices = frappe._dict(
+            valid={f"_Test Supplier {idx}": [] for idx in range(5)}
+        )
+        processor.create_payments_for_supplier = lambda supplier_name, invoices: True
+
+        with patch.object(frappe.db, "commit") as commit:
+            processor.create_supplier_payments(
+                list(processor.processed_invoices.valid), commit_batch_size=2
+            )
+
+        # after 2 and 4 suppliers, and at the end
+        self.assertEqual(commit.call_count, 3)
+
+
+class TestFilterHooks(FrappeTestCase):
+    def setUp(self):
+        filtered_invoices.clear()
+
+    def test_bulk_and_per_invoice_hooks(self):
+        processor = get_processor(COMPANY)
+        processor.suppliers = {"_Test Supplier": frappe._dict(name="_Test Supplier")}
+        invoices = [
+            Invoice(name=f"_Test PI {idx}", supplier="_Test Supplier")
+            for idx in range(6)
+        ]
+
+        with patch_filter_hooks() as get_hooks:
+            rejected = processor.run_filter_hooks(
+                "filter_auto_generate_payments", invoices
+            )
+            processor.run_filter_hooks("filter_auto_generate_payments", invoices)
+
+        self.assertEqual(
+            {name: msg["reason_code"] for name, msg in rejected.items()},
+            {
+                "_Test PI 0": "9998",
+                "_Test PI 1": "9999",
+                "_Test PI 2": "9998",
+                "_Test PI 4": "9998",
+            },
+        )
+
+        # invoices rejected by the bulk hook are not passed to per-invoice hooks
+        self.assertEqual(
+            filtered_invoices,
+            [("_Test Supplier", f"_Test PI {idx}") for idx in (1, 3, 5)] * 2,
+        )
+
+        # hooks are resolved once per run
+        self.assertEqual(get_hooks.call_count, 2)
+
+    def test_rejected_invoices(self):
+        make_ledger(200, COMPANY)
+        self.addCleanup(delete_ledger)
+
+        expected = get_processor(COMPANY, auto_generate_entries=1)
+        expected.process_invoices()
+        candidates = {
+            invoice.name
+            for invoices in expected.processed_invoices.valid.values()
+            for invoice in invoices
+        }
+
+        processor = get_processor(COMPANY, auto_generate_entries=1)
+
+        with patch_filter_hooks():
+            processor.process_invoices()
+
+        invalid = {
+            invoice.name: invoice
+            for invoices in processor.processed_invoices.invalid.values()
+            for invoice in invoices
+        }
+        valid = {
+            invoice.name
+            for invoices in processor.processed_invoices.valid.values()
+            for invoice in invoices
+        }
+
+        rejected = {name for name in candidates if name[-1] in "012468"}
+        self.assertTrue(rejected)
+        self.assertFalse(rejected & valid)
+
+        for name in rejected:
+            self.assertIn(invalid[name].reason_code, ("9998", "9999"))
+            self.assertFalse(invalid[name].auto_generate)
+
+        self.assertEqual(
+            sum(processor.supplier_paid_amount.values()),
+            sum(
+                invoice.amount_to_pay
+                for invoices in processor.processed_invoices.valid.values()
+                for invoice in invoices
+            ),
+        )
+
+
+class PaymentEntry:
+    def __init__(self, fail=False):
+        self.name = frappe.generate_hash(length=10)
+        self.paid_amount = 100
+        self.status = "Draft"
+        self.paid_from_account_currency = "INR"
+        self.flags = frappe._dict()
+        self.fail = fail
+
+    def save(self):
+        if self.fail:
+            frappe.throw("Payment Entry could not be saved")
+
+
+class InProcessExecutor:
+    """
+    Runs tasks of payment workers in the test process, with arguments and
+    results pickled as for spawned workers.
+    """
+
+    start_method = None
+
+    def __init__(self, max_workers, mp_context):
+        InProcessExecutor.start_method = mp_context.get_start_method()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def submit(self, fn, *args):
+        future = Future()
+        result = fn(*pickle.loads(pickle.dumps(args)))
+        future.set_result(pickle.loads(pickle.dumps(result)))
+        return future
+
+
+def create_payments_for_supplier(self, supplier_name, invoices):
+    # lease is checked from the worker
+    self.check_lease()
+
+    if supplier_name == "_Test Supplier 2":
+        return False
+
+    for invoice in invoices:
+        invoice.payment_entry = f"_Test PE {invoice.name}"
+        invoice.pe_status = "Draft"
+
+    return True
+
+
+# per-invoice filter hook calls, as (supplier, invoice)
+filtered_invoices = []
+
+
+def patch_filter_hooks():
+    hooks = {
+        "bulk_filter_auto_generate_payments": [f"{__name__}.reject_even_invoices"],
+        "filter_auto_generate_payments": [f"{__name__}.reject_invoices_ending_in_1"],
+    }
+
+    return patch("frappe.get_hooks", side_effect=lambda hook: hooks.get(hook, []))
+
+
+def reject_even_invoices(invoices, suppliers):
+    return {
+        invoice.name: {"reason": "Even invoice", "reason_code": "9998"}
+        for invoice in invoices
+        if invoice.name[-1] in "02468"
+    }
+
+
+def reject_invoices_ending_in_1(supplier, invoice):
+    filtered_invoices.append((supplier.name, invoice.name))
+
+    if invoice.name.endswith("1"):
+        return {"reason": "Invoice ending in 1", "reason_code": "9999"}
+
+
+def get_random_setting(seed):
+    rng = random.Random(seed)
+    today = getdate()
+
+    setting = frappe._dict(
+        {
+            "company": COMPANY,
+            "due_date_offset": rng.randint(0, 5),
+            "claim_early_payment_discount": rng.randint(0, 1),
+            **{
+                f"automate_on_{day.lower()}": 1
+                for day in rng.sample(DAY_NAMES, rng.randint(1, 7))
+            },
+        }
+    )
+
+    if rng.random() < 0.5:
+        setting.holiday_list = make_holiday_list(
+            sorted({add_days(today, rng.randint(-60, 60)) for _ in range(15)})
+        )
+
+    filters = {"payment_date": rng.choice((None, add_days(today, rng.randint(0, 30))))}
+
+    return setting, filters
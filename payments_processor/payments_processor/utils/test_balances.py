@@ -0,0 +1,43 @@
+# Copyright (c) 2025, Resilient Tech and Contributors
+# See license.txt
+
+import frappe
+from erpnext.accounts.doctype.purchase_invoice.test_purchase_invoice import (
+    make_purchase_invoice,
+)
+from erpnext.accounts.utils import get_balance_on
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_days, getdate
+
+from payments_processor.payments_processor.utils.balances import get_party_balances
+
+COMPANY = "_Test Company"
+
+
+class TestPartyBalances(FrappeTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        make_purchase_invoice(rate=500)
+        make_purchase_invoice(rate=300, supplier="_Test Supplier 1")
+        make_purchase_invoice(rate=200, qty=-1, is_return=1)
+
+    def test_parity_with_get_balance_on(self):
+        suppliers = frappe.get_all("Supplier", pluck="name")
+        date = add_days(getdate(), 365)
+
+        # small batch size to cover batching
+        balances = get_party_balances(
+            "Supplier", suppliers, COMPANY, date, batch_size=2
+        )
+
+        for supplier in suppliers:
+            expected = get_balance_on(
+                date=date, party_type="Supplier", party=supplier, company=COMPANY
+            )
+
+            self.assertEqual(balances.get(supplier, 0), expected, supplier)
+
+    def test_empty_parties(self):
+        self.assertEqual(get_party_balances("Supplier", [], COMPANY), {})
@@ -0,0 +1,53 @@
+# Copyright (c) 2026, Resilient Tech and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import create_batch
+
+from payments_processor.payments_processor.benchmarks.columnar import (
+    get_processor,
+    get_sample_rows,
+)
+from payments_processor.payments_processor.utils.columnar import ColumnarEvaluator
+
+COMPANY = "_Test Company"
+
+
+class TestColumnarEvaluator(FrappeTestCase):
+    def test_matches_rowwise_evaluation(self):
+        settings = (
+            {},
+            {"claim_early_payment_discount": 0},
+            {"automate_on_thursday": 0, "automate_on_sunday": 1, "due_date_offset": 0},
+        )
+
+        for setting in settings:
+            for seed in range(3):
+                with self.subTest(setting=setting, seed=seed):
+                    self.assertEvaluationMatches(setting, seed)
+
+    def test_matches_rowwise_evaluation_in_batches(self):
+        # terms of an invoice spread across batches
+        self.assertEvaluationMatches({}, seed=7, batch_size=97)
+
+    def assertEvaluationMatches(self, setting, seed, batch_size=None):
+        processor = get_processor(COMPANY, **setting)
+        rows = get_sample_rows(2000, processor.today, seed=seed)
+
+        processor.invoices = frappe._dict()
+        for row in copy_rows(rows):
+            processor.process_invoice_row(row)
+
+        expected = processor.invoices
+
+        processor.invoices = frappe._dict()
+        for batch in create_batch(copy_rows(rows), batch_size or len(rows)):
+            ColumnarEvaluator(processor).process(batch)
+
+        self.assertEqual(processor.invoices, expected)
+        self.assertEqual(list(processor.invoices), list(expected))
+
+
+def copy_rows(rows):
+    return [frappe._dict(row) for row in rows]
@@ -0,0 +1,91 @@
+# Copyright (c) 2026, Resilient Tech and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from payments_processor.payments_processor.benchmarks.columnar import get_sample_rows
+from payments_processor.payments_processor.utils.automation import PaymentsProcessor
+from payments_processor.payments_processor.utils.forecast import CashForecast
+
+COMPANY = "_Test Company"
+
+
+class TestCashForecast(FrappeTestCase):
+    def test_payment_dates(self):
+        forecast = get_forecast(payment_dates=5)
+        dates = forecast.payment_dates
+
+        self.assertEqual(len(dates), 5)
+        self.assertEqual(dates, sorted(set(dates)))
+        self.assertGreater(dates[0], forecast.today)
+        self.assertTrue(all(date.weekday() in (0, 3) for date in dates))
+
+    def test_matches_processor_for_each_payment_date(self):
+        forecast = get_forecast()
+        rows = get_sample_rows(2000, forecast.today)
+
+        forecast.get_invoice_rows = lambda: [copy_rows(rows)]
+        forecast.get_invoices()
+
+        due = {}
+
+        for index, payment_date in enumerate(forecast.payment_dates):
+            for invoice in forecast.schedule[index].values():
+                self.assertEqual(invoice.payment_date, payment_date)
+                due.setdefault(invoice.name, []).append(invoice)
+
+            processor = PaymentsProcessor(
+                forecast.setting, frappe._dict(payment_date=payment_date)
+            )
+            processor.get_invoice_rows = lambda: [copy_rows(rows)]
+            processor.get_invoices()
+
+            expected = {
+                name: invoice
+                for name, invoice in processor.invoices.items()
+                if invoice.is_return or invoice.total_outstanding_due > 0
+            }
+
+            self.assertLessEqual(set(due), set(processor.invoices))
+            self.assertLessEqual(set(expected), set(due))
+
+            for name, invoice in expected.items():
+                self.assertAlmostEqual(
+                    sum(row.total_outstanding_due for row in due[name]),
+                    invoice.total_outstanding_due,
+                    places=4,
+                )
+
+        # same terms are due on the last payment date (returns are claimed on the first)
+        terms = {
+            term.name: term
+            for invoice in processor.invoices.values()
+            if not invoice.is_return
+            for term in invoice.payment_terms
+        }
+
+        for invoices in due.values():
+            for invoice in invoices:
+                for term in invoice.payment_terms:
+                    if expected_term := terms.get(term.name):
+                        self.assertEqual(term, expected_term)
+
+
+def get_forecast(payment_dates=12):
+    return CashForecast(
+        frappe._dict(
+            {
+                "company": COMPANY,
+                "automate_on_monday": 1,
+                "automate_on_thursday": 1,
+                "claim_early_payment_discount": 1,
+                "due_date_offset": 2,
+            }
+        ),
+        payment_dates,
+    )
+
+
+def copy_rows(rows):
+    return [frappe._dict(row) for row in rows]
@@ -0,0 +1,90 @@
+# Copyright (c) 2026, Resilient Tech and Contributors
+# See license.txt
+
+import pickle
+import time
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from payments_processor.payments_processor.utils.lease import (
+    LeaseLostError,
+    RunLease,
+)
+
+
+class TestRunLease(FrappeTestCase):
+    def test_single_holder(self):
+        lease = RunLease("_Test Lease")
+        self.assertTrue(lease.acquire())
+
+        try:
+            self.assertFalse(RunLease("_Test Lease").acquire())
+        finally:
+            lease.release()
+
+        other = RunLease("_Test Lease")
+        self.assertTrue(other.acquire())
+        other.release()
+
+    def test_release_by_other_run(self):
+        lease = RunLease("_Test Lease", heartbeat=False)
+        self.assertTrue(lease.acquire())
+
+        # not held by this run
+        RunLease("_Test Lease").release()
+        self.assertFalse(RunLease("_Test Lease").acquire())
+
+        lease.release()
+
+    def test_heartbeat_keeps_lease(self):
+        lease = RunLease("_Test Lease", ttl=1)
+        self.assertTrue(lease.acquire())
+
+        try:
+            time.sleep(1.5)
+            self.assertFalse(RunLease("_Test Lease").acquire())
+            self.assertFalse(lease.lost)
+        finally:
+            lease.release()
+
+    def test_stale_lease_takeover(self):
+        stale = RunLease("_Test Lease", ttl=1, heartbeat=False)
+        self.assertTrue(stale.acquire())
+
+        time.sleep(1.5)
+
+        lease = RunLease("_Test Lease")
+        self.assertTrue(lease.acquire())
+        self.assertFalse(stale.renew())
+
+        lease.release()
+
+    def test_check_after_takeover(self):
+        stale = RunLease("_Test Lease", ttl=1, heartbeat=False)
+        self.assertTrue(stale.acquire())
+        stale.check()
+
+        time.sleep(1.5)
+
+        lease = RunLease("_Test Lease")
+        self.assertTrue(lease.acquire())
+
+        with self.assertRaises(LeaseLostError):
+            stale.check()
+
+        self.assertTrue(stale.lost)
+        lease.release()
+
+    def test_pickled_lease_is_checked(self):
+        lease = RunLease("_Test Lease")
+        self.assertTrue(lease.acquire())
+        self.addCleanup(lease.release)
+
+        # as sent to a payment worker
+        worker_lease = pickle.loads(pickle.dumps(lease))
+        self.assertFalse(worker_lease.heartbeat)
+        worker_lease.check()
+
+        frappe.cache.delete(lease.key)
+        self.assertRaises(LeaseLostError, worker_lease.check)
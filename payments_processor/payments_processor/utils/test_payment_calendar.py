@@ -0,0 +1,84 @@
+# Copyright (c) 2026, Resilient Tech and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import getdate
+
+from payments_processor.payments_processor.utils.payment_calendar import (
+    PaymentCalendar,
+)
+
+MONDAY = getdate("2026-10-19")
+
+
+class TestPaymentCalendar(FrappeTestCase):
+    def test_previous_and_next_payment_dates(self):
+        calendar = PaymentCalendar(
+            frappe._dict({"automate_on_monday": 1, "automate_on_thursday": 1})
+        )
+
+        self.assertEqual(calendar.days, ["Monday", "Thursday"])
+        self.assertTrue(calendar.is_payment_day(MONDAY))
+        self.assertFalse(calendar.is_payment_day(getdate("2026-10-20")))
+
+        self.assertEqual(calendar.get_previous(MONDAY), getdate("2026-10-15"))
+        self.assertEqual(calendar.get_next(MONDAY), getdate("2026-10-22"))
+        self.assertEqual(calendar.get_next(MONDAY, inclusive=True), MONDAY)
+        self.assertEqual(
+            calendar.get_next(getdate("2026-10-23")), getdate("2026-10-26")
+        )
+
+    def test_holidays(self):
+        holiday_list = make_holiday_list(["2026-10-15", "2026-10-22"])
+        calendar = PaymentCalendar(
+            frappe._dict(
+                {
+                    "automate_on_monday": 1,
+                    "automate_on_thursday": 1,
+                    "holiday_list": holiday_list,
+                }
+            ),
+            start=MONDAY,
+        )
+
+        self.assertFalse(calendar.is_payment_day(getdate("2026-10-22")))
+        self.assertEqual(calendar.get_previous(MONDAY), getdate("2026-10-12"))
+        self.assertEqual(calendar.get_next(MONDAY), getdate("2026-10-26"))
+        self.assertEqual(
+            calendar.get_previous(getdate("2026-10-23")), getdate("2026-10-19")
+        )
+
+    def test_single_payment_day(self):
+        calendar = PaymentCalendar(frappe._dict({"automate_on_monday": 1}))
+
+        self.assertEqual(calendar.get_previous(MONDAY), getdate("2026-10-12"))
+        self.assertEqual(calendar.get_next(MONDAY), getdate("2026-10-26"))
+
+    def test_no_payment_days(self):
+        calendar = PaymentCalendar(frappe._dict())
+
+        self.assertIsNone(calendar.get_previous(MONDAY))
+        self.assertIsNone(calendar.get_next(MONDAY, inclusive=True))
+
+
+def make_holiday_list(dates):
+    name = "_Test Payments Processor Holidays"
+    if frappe.db.exists("Holiday List", name):
+        frappe.delete_doc("Holiday List", name)
+
+    return (
+        frappe.get_doc(
+            {
+                "doctype": "Holiday List",
+                "holiday_list_name": name,
+                "from_date": min(dates),
+                "to_date": max(dates),
+                "holidays": [
+                    {"holiday_date": date, "description": "Holiday"} for date in dates
+                ],
+            }
+        )
+        .insert()
+        .name
+    )
@@ -0,0 +1,78 @@
+# Copyright (c) 2026, Resilient Tech and Contributors
+# See license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import get_table_name
+
+from payments_processor.constants import CONFIGURATION_DOCTYPE
+from payments_processor.payments_processor.benchmarks.ledger import (
+    delete_ledger,
+    make_ledger,
+)
+from payments_processor.payments_processor.constants.indexes import (
+    INDEX_PREFIX,
+    INDEXES,
+)
+from payments_processor.payments_processor.setup import (
+    delete_indexes,
+    get_index_name,
+    make_indexes,
+)
+from payments_processor.payments_processor.utils.query_plan import check_query_plans
+
+COMPANY = "_Test Company"
+
+
+class TestQueryPlan(FrappeTestCase):
+    def test_indexes(self):
+        # indexes are restored even if the test fails
+        self.addCleanup(make_indexes, INDEXES, INDEX_PREFIX)
+
+        delete_indexes(INDEXES, INDEX_PREFIX)
+        self.assertFalse(any(has_indexes()))
+
+        make_indexes(INDEXES, INDEX_PREFIX)
+        self.assertTrue(all(has_indexes()))
+
+        # existing indexes are skipped
+        make_indexes(INDEXES, INDEX_PREFIX)
+        self.assertTrue(all(has_indexes()))
+
+    def test_no_full_scans(self):
+        # before the ledger is inserted, as DDL commits the transaction
+        make_indexes(INDEXES, INDEX_PREFIX)
+
+        make_ledger(1000, COMPANY)
+        self.addCleanup(delete_ledger)
+
+        setting = frappe._dict(
+            name="_Test Configuration",
+            company=COMPANY,
+            automate_on_monday=1,
+            automate_on_thursday=1,
+            claim_early_payment_discount=1,
+            due_date_offset=2,
+        )
+        get_all = frappe.get_all
+
+        def get_configurations(doctype, *args, **kwargs):
+            if doctype == CONFIGURATION_DOCTYPE:
+                return [setting]
+
+            return get_all(doctype, *args, **kwargs)
+
+        with patch("frappe.get_all", side_effect=get_configurations):
+            self.assertEqual(check_query_plans(COMPANY), {"_Test Configuration": {}})
+
+
+def has_indexes():
+    return [
+        frappe.db.has_index(
+            get_table_name(doctype), get_index_name(fields, INDEX_PREFIX)
+        )
+        for doctype, doctype_indexes in INDEXES.items()
+        for fields in doctype_indexes
+    ]
@@ -0,0 +1,79 @@
+# Copyright (c) 2026, Resilient Tech and Contributors
+# See license.txt
+
+import pickle
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from payments_processor.payments_processor.utils.records import Invoice, PaymentTerm
+
+
+class TestRecords(FrappeTestCase):
+    def test_mapping_access(self):
+        invoice = get_invoice()
+
+        self.assertEqual(invoice.supplier, "_Test Supplier")
+        self.assertEqual(invoice["supplier"], invoice.get("supplier"))
+        self.assertIsNone(invoice.amount_to_pay)
+        self.assertIsNone(invoice.get("amount_to_pay"))
+        self.assertNotIn("amount_to_pay", invoice)
+        self.assertRaises(KeyError, lambda: invoice["amount_to_pay"])
+
+        # payment term fields of the row are ignored
+        self.assertNotIn("term_name", invoice)
+
+        invoice.update({"reason": "Blocked", "reason_code": "2001"})
+        self.assertEqual({**invoice}["reason_code"], "2001")
+
+    def test_extra_fields(self):
+        invoice = get_invoice()
+        invoice["custom_field"] = 1
+        invoice.update({"other_field": 2})
+
+        self.assertEqual(invoice.custom_field, 1)
+        self.assertEqual(invoice.get("custom_field"), 1)
+        self.assertEqual(invoice.as_dict().other_field, 2)
+
+        # only fields can be set as attributes
+        with self.assertRaises(AttributeError):
+            invoice.unknown_field = 1
+
+    def test_unset_fields(self):
+        invoice = get_invoice()
+
+        self.assertIsNone(invoice._extra)
+        self.assertNotIn("custom_field", invoice)
+        self.assertNotIn("keys", invoice)
+        self.assertEqual(set(invoice), {"name", "supplier", "outstanding_amount"})
+        self.assertIsNone(invoice._extra)
+
+        # cleared fields are not set
+        invoice.update({"supplier": None})
+        self.assertNotIn("supplier", invoice.as_dict())
+        self.assertEqual(invoice.get("supplier", "_Test Supplier"), "_Test Supplier")
+
+    def test_as_dict_and_pickle(self):
+        invoice = get_invoice()
+        invoice.payment_terms = [PaymentTerm(name="TERM-1", outstanding_amount=100)]
+
+        as_dict = invoice.as_dict()
+        self.assertIsInstance(as_dict, frappe._dict)
+        self.assertEqual(
+            as_dict.payment_terms, [{"name": "TERM-1", "outstanding_amount": 100}]
+        )
+
+        self.assertEqual(pickle.loads(pickle.dumps(invoice)), invoice)
+
+
+def get_invoice():
+    return Invoice.from_row(
+        frappe._dict(
+            {
+                "name": "PI-00001",
+                "supplier": "_Test Supplier",
+                "outstanding_amount": 100,
+                "term_name": "TERM-1",
+            }
+        )
+    )
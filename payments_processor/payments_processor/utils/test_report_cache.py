@@ -0,0 +1,70 @@
+# Copyright (c) 2026, Resilient Tech and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import getdate
+
+from payments_processor.constants import CONFIGURATION_DOCTYPE
+from payments_processor.payments_processor.utils.report_cache import (
+    WATERMARK_DOCTYPES,
+    get_cache_version,
+    get_cached_result,
+    invalidate_cache,
+)
+
+COMPANY = "_Test Company"
+
+
+class TestReportCache(FrappeTestCase):
+    def test_cached_until_invalidated(self):
+        computed = []
+
+        def compute():
+            computed.append(1)
+            return [{"name": "_Test PI"}]
+
+        for _ in range(2):
+            result = get_cached_result(COMPANY, getdate(), compute)
+
+        self.assertEqual(result, [{"name": "_Test PI"}])
+        self.assertEqual(len(computed), 1)
+
+        invalidate_cache()
+        get_cached_result(COMPANY, getdate(), compute)
+
+        self.assertEqual(len(computed), 2)
+
+    def test_invalidated_on_configuration_change(self):
+        doc = frappe.get_doc({"doctype": CONFIGURATION_DOCTYPE, "company": COMPANY})
+
+        for method in ("on_update", "on_trash"):
+            with self.subTest(method=method):
+                version = get_cache_version()
+                doc.run_method(method)
+
+                self.assertNotEqual(get_cache_version(), version)
+
+    def test_invalidated_by_document_events(self):
+        version = get_cache_version()
+        frappe.get_doc("Supplier", "_Test Supplier").save()
+
+        self.assertNotEqual(get_cache_version(), version)
+
+        doc_events = frappe.get_hooks("doc_events")
+        invalidate = (
+            "payments_processor.payments_processor.utils.report_cache.invalidate_cache"
+        )
+
+        for doctype in WATERMARK_DOCTYPES:
+            if doctype == CONFIGURATION_DOCTYPE:
+                # invalidated by the controller
+                continue
+
+            with self.subTest(doctype=doctype):
+                self.assertTrue(
+                    any(
+                        invalidate in handlers
+                        for handlers in doc_events[doctype].values()
+                    )
+                )
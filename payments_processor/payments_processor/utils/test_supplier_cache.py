@@ -0,0 +1,42 @@
+# Copyright (c) 2026, Resilient Tech and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from payments_processor.payments_processor.utils.supplier_cache import (
+    PartyDetailsCache,
+    invalidate_bank_account,
+    invalidate_contact,
+)
+
+SUPPLIER = "_Test Cached Supplier"
+
+
+class TestPartyDetailsCache(FrappeTestCase):
+    def test_invalidated_by_bank_account_and_contact(self):
+        cache = PartyDetailsCache()
+        self.addCleanup(cache.delete, [SUPPLIER])
+
+        events = (
+            (
+                invalidate_bank_account,
+                frappe._dict(party_type="Supplier", party=SUPPLIER),
+            ),
+            (
+                invalidate_contact,
+                frappe._dict(
+                    links=[frappe._dict(link_doctype="Supplier", link_name=SUPPLIER)]
+                ),
+            ),
+        )
+
+        for invalidate, doc in events:
+            cache.set_many({SUPPLIER: (None, None)})
+            doc.get_doc_before_save = lambda: None
+
+            invalidate(doc)
+            self.assertEqual(cache.get_many([SUPPLIER]), {SUPPLIER: (None, None)})
+
+            frappe.db.after_commit.run()
+            self.assertEqual(cache.get_many([SUPPLIER]), {})
@@ -10,15 +10,24 @@ from payments_processor.payments_processor.constants.custom_fields import (
 from payments_processor.payments_processor.constants.email_template import (
     EMAIL_TEMPLATES,
 )
+from payments_processor.payments_processor.constants.indexes import (
+    INDEX_PREFIX,
+    INDEXES,
+)
 from payments_processor.payments_processor.constants.property_setters import (
     PROPERTY_SETTERS,
 )
 from payments_processor.payments_processor.constants.roles import ROLES
+from payments_processor.payments_processor.doctype.payments_processor_candidate.payments_processor_candidate import (
+    rebuild_candidates,
+)
 from payments_processor.payments_processor.setup import (
     delete_custom_fields,
+    delete_indexes,
     delete_property_setters,
     delete_roles_and_permissions,
     make_email_templates,
+    make_indexes,
     make_roles_and_permissions,
 )
 
@@ -37,6 +46,12 @@ def setup_customizations():
     click.secho("Creating Email Templates...", fg="blue")
     create_email_templates()
 
+    click.secho("Creating Indexes...", fg="blue")
+    create_indexes()
+
+    click.secho("Building Payment Candidates...", fg="blue")
+    create_payment_candidates()
+
 
 # Note: separate functions are required to use in patches
 def create_roles_and_permissions():
@@ -56,6 +71,14 @@ def create_email_templates():
     make_email_templates(EMAIL_TEMPLATES)
 
 
+def create_indexes():
+    make_indexes(INDEXES, INDEX_PREFIX)
+
+
+def create_payment_candidates():
+    rebuild_candidates()
+
+
 ################### Before Uninstall ###################
 def delete_customizations():
     click.secho("Deleting Custom Fields...", fg="blue")
@@ -66,3 +89,6 @@ def delete_customizations():
 
     click.secho("Deleting Roles and Permissions...", fg="blue")
     delete_roles_and_permissions(ROLES)
+
+    click.secho("Deleting Indexes...", fg="blue")
+    delete_indexes(INDEXES, INDEX_PREFIX)